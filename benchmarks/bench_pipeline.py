@@ -0,0 +1,224 @@
+"""Offline end-to-end benchmark of jobscraper against the local BuiltIn/search stand-in.
+
+For each scale, a fresh StandIn serves that many synthetic jobs, and the benchmark measures:
+
+    parse_results         listing pages + company lookups, per job
+    NetworkingAssistant   contact search + link resolution, per company
+    CoverLetterWriter     PDF + TXT rendering, per letter
+    pipeline              all of the above through main()'s Pipeline, end to end
+
+reporting jobs/sec, per-item latency percentiles and peak traced memory for each stage.
+The pipeline's stages overlap, so it has no per-item latency: its mean and percentiles
+are written as null, and only its throughput and memory are compared.
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --scales 10 100 1000 --out bench_results.json
+
+and compare the JSON files written for different commits.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+from benchmarks.standin import StandIn, StandInData, StandInSearch
+from scrape.builtin_getter import iter_listing_pages, parse_results
+from scrape.configs import JobScrapeConfig, PersonaConfig
+from scrape.coverletterwriter import CoverLetterWriter
+from scrape.fetch_engine import configure_engine
+from scrape.networkingasst import NetworkingAssistant
+from scrape.pipeline import Pipeline
+from scrape.render_pool import RenderPool
+from scrape.search import HttpSearch, SearchQueue
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class StageResult:
+    stage: str
+    items: int
+    total_s: float
+    items_per_s: float
+    mean_ms: Optional[float]
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    peak_mb: Optional[float]
+
+
+@dataclass
+class ScaleResult:
+    scale: int
+    pages: int
+    standin_requests: int
+    stages: list[StageResult] = field(default_factory=list)
+
+
+def measure(
+    stage: str,
+    items: Iterable,
+    func: Callable,
+    trace_memory: bool,
+) -> tuple[StageResult, list]:
+    """Calls func on each item, timing every call, and returns the stage's statistics and outputs."""
+    if trace_memory:
+        tracemalloc.start()
+    latencies, outputs = [], []
+    start = perf_counter()
+    for item in items:
+        item_start = perf_counter()
+        outputs.append(func(item))
+        latencies.append(perf_counter() - item_start)
+    total = perf_counter() - start
+    peak_mb = None
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return summarise(stage, latencies, total, peak_mb), outputs
+
+
+def summarise(
+    stage: str, latencies: list[float], total: float, peak_mb: Optional[float]
+) -> StageResult:
+    cuts = quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+    return StageResult(
+        stage=stage,
+        items=len(latencies),
+        total_s=round(total, 4),
+        items_per_s=round(len(latencies) / total, 2) if total else 0.0,
+        mean_ms=round(mean(latencies) * 1000, 3) if latencies else 0.0,
+        p50_ms=round(cuts[9] * 1000, 3) if cuts else 0.0,
+        p95_ms=round(cuts[18] * 1000, 3) if cuts else 0.0,
+        peak_mb=round(peak_mb, 2) if peak_mb is not None else None,
+    )
+
+
+def make_config(standin: StandIn, workdir: Path, render_workers: int) -> tuple[JobScrapeConfig, PersonaConfig]:
+    data = json.loads((ROOT / "config_dummy.json").read_text(encoding="utf-8"))
+    data["persona"] = json.loads((ROOT / "config_persona_dummy.json").read_text(encoding="utf-8"))
+    for key in ("brand_names", "surnames", "font_regular", "font_bold", "font_italic", "font_bolditalic"):
+        data[key] = str((ROOT / data[key]).resolve())
+    data.update(
+        url_builtin=standin.url_builtin,
+        url_company=standin.url_company,
+        total_pages=standin.data.total_pages + 1,
+        export_dir=str(workdir / "exports"),
+        cache_path=str(workdir / "cache.sqlite3"),
+        journal_path=str(workdir / "journal.jsonl"),
+        requests_per_second=0,
+        render_workers=render_workers,
+    )
+    return JobScrapeConfig(**data), PersonaConfig(**data["persona"])
+
+
+def run_scale(scale: int, per_page: int, render_workers: int, trace_memory: bool, fixtures: Optional[Path]) -> ScaleResult:
+    data = StandInData(scale, per_page=per_page, fixtures=fixtures)
+    with StandIn(data) as standin, tempfile.TemporaryDirectory() as tmp:
+        config, persona = make_config(standin, Path(tmp), render_workers)
+        configure_engine(config)
+        search = StandInSearch(standin.base_url)
+        result = ScaleResult(scale=scale, pages=data.total_pages, standin_requests=0)
+
+        stage, pages = measure(
+            "parse_results",
+            range(1, config.total_pages),
+            lambda page: parse_results(config.url_builtin, {**config.querystring, "page": page}, page, config),
+            trace_memory,
+        )
+        companies = [company for page in pages for company in page]
+        stage.items = len(companies)
+        stage.items_per_s = round(len(companies) / stage.total_s, 2) if stage.total_s else 0.0
+        result.stages.append(stage)
+
+        stage, cards = measure(
+            "NetworkingAssistant",
+            companies,
+            lambda company: NetworkingAssistant(company=company, config=config, search=search).gratuitous_schmoozing(),
+            trace_memory,
+        )
+        result.stages.append(stage)
+
+        stage, _ = measure(
+            "CoverLetterWriter",
+            list(zip(companies, cards)),
+            lambda pair: CoverLetterWriter(pair[0], contact=pair[1], persona=persona, config=config).write(),
+            trace_memory,
+        )
+        result.stages.append(stage)
+
+        if trace_memory:
+            tracemalloc.start()
+        start = perf_counter()
+        with RenderPool(config.render_workers) as render_pool:
+            search_queue = SearchQueue(
+                HttpSearch(f"{standin.base_url}/search", rate=0), concurrency=config.search_concurrency
+            )
+            pipeline = Pipeline(config, persona, render_pool=render_pool, search=search_queue)
+            rendered = pipeline.run(iter_listing_pages(config.url_builtin, config.querystring, config))
+            search_queue.close()
+        total = perf_counter() - start
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20 if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+        stage = StageResult(
+            stage="pipeline",
+            items=len(rendered),
+            total_s=round(total, 4),
+            items_per_s=round(len(rendered) / total, 2) if total else 0.0,
+            mean_ms=None,
+            p50_ms=None,
+            p95_ms=None,
+            peak_mb=round(peak_mb, 2) if peak_mb is not None else None,
+        )
+        result.stages.append(stage)
+        result.standin_requests = standin.requests
+    return result
+
+
+def git_commit() -> str:
+    completed = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return completed.stdout.strip() or "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--render-workers", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc, which slows every stage down")
+    parser.add_argument("--fixtures", type=Path, default=None, help="directory of recorded listing/company JSON")
+    parser.add_argument("--out", type=Path, default=Path("bench_results.json"))
+    args = parser.parse_args()
+
+    results = [
+        run_scale(scale, args.per_page, args.render_workers, not args.no_memory, args.fixtures)
+        for scale in args.scales
+    ]
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [asdict(result) for result in results],
+    }
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    for result in results:
+        print(f"\nscale {result.scale} ({result.pages} pages, {result.standin_requests} stand-in requests)")
+        print(f"{'stage':<20} {'items':>6} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'peak MB':>8}")
+        for stage in result.stages:
+            peak = f"{stage.peak_mb:.1f}" if stage.peak_mb is not None else "-"
+            p50 = f"{stage.p50_ms:.1f}" if stage.p50_ms is not None else "-"
+            p95 = f"{stage.p95_ms:.1f}" if stage.p95_ms is not None else "-"
+            print(f"{stage.stage:<20} {stage.items:>6} {stage.items_per_s:>10.1f} {p50:>9} {p95:>9} {peak:>8}")
+    print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Micro-benchmark for the page-source stopword filter.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_token_filter --tokens 200000
+"""
+import argparse
+import random
+from time import perf_counter
+
+from scrape.token_filter import get_webtext_filter
+
+
+def make_page(stopwords: list[str], n_tokens: int, seed: int = 0) -> list[str]:
+    """Builds a large synthetic page: mostly corpus words, with some title-cased names mixed in."""
+    rng = random.Random(seed)
+    names = ["Jane", "Doe", "Ravi", "Okafor", "Maria", "Lindqvist"]
+    return [
+        rng.choice(names) if rng.random() < 0.05 else rng.choice(stopwords)
+        for _ in range(n_tokens)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    token_filter = get_webtext_filter()
+    build = perf_counter() - start
+    page = make_page(sorted(token_filter.stopwords), args.tokens)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = perf_counter()
+        # the way read_page_source checks a page's words, one at a time as they stream in
+        kept = [token for token in page if token not in token_filter]
+        best = min(best, perf_counter() - start)
+
+    print(f"stopwords:      {len(token_filter)} (built in {build:.3f}s)")
+    print(f"page tokens:    {len(page)}")
+    print(f"tokens kept:    {len(kept)}")
+    print(f"best of {args.repeat}:      {best:.4f}s")
+    print(f"throughput:     {len(page) / best:,.0f} tokens/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""A local stand-in for api.builtin.com and for contact search, for offline benchmarks.
+
+StandIn serves, over plain HTTP on 127.0.0.1:
+
+    /services/job-retrieval/legacy-jobs?page=N   listing pages: {"jobs": [...], "companies": [...]}
+    /companies/alias/<alias>                     company JSON, as returned by BuiltIn
+    /contact/<alias>                             an HTML contact page naming someone at the company
+    /search?q=<query>                            a JSON list of candidate contact links
+
+The data is either synthetic (deterministic for a given seed and scale) or recorded:
+a fixtures directory holding listing_<page>.json and companies/<alias>.json files
+is served as-is, falling back to synthetic data for anything missing.
+"""
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from requests import get
+
+FIRST = ["Jane", "Ravi", "Maria", "Kwame", "Ingrid", "Tomas", "Aiko", "Liam"]
+LAST = ["Doe", "Okafor", "Lindqvist", "Moreau", "Tanaka", "Reyes", "Novak", "Smith"]
+INDUSTRIES = ["Fintech", "Healthtech", "Edtech", "Software", "Consumer Web", "Design"]
+ADJECTIVES = ["Collaborative", "Innovative", "Fast-Paced", "Remote-Friendly", "Inclusive"]
+SKILL_TEXT = [
+    "user experience design",
+    "prototyping",
+    "figma",
+    "typography",
+    "brand strategy",
+    "user research",
+    "adobe illustrator",
+    "motion graphics",
+]
+FILLER = "We are looking for a thoughtful design leader to join our growing team. "
+
+
+class StandInData:
+    """Synthetic BuiltIn listings, companies and contact pages for `scale` jobs,
+    `per_page` to a listing page. Every tenth job is at a company that already has another open role.
+    """
+
+    def __init__(
+        self,
+        scale: int,
+        per_page: int = 100,
+        seed: int = 0,
+        fixtures: Optional[Path] = None,
+    ):
+        self.scale = scale
+        self.per_page = per_page
+        self.seed = seed
+        self.fixtures = fixtures
+
+    @property
+    def total_pages(self) -> int:
+        return -(-self.scale // self.per_page)
+
+    def _company_index(self, job_index: int) -> int:
+        return job_index // 3 if job_index % 10 == 0 else job_index
+
+    def alias(self, company_index: int) -> str:
+        return f"standin-company-{company_index}"
+
+    def listing(self, page: int) -> dict:
+        fixture = self._fixture(f"listing_{page}.json")
+        if fixture is not None:
+            return fixture
+        start = (page - 1) * self.per_page
+        stop = min(start + self.per_page, self.scale)
+        jobs, companies = [], []
+        for job_index in range(start, max(start, stop)):
+            rng = random.Random(self.seed * 1_000_003 + job_index)
+            company_index = self._company_index(job_index)
+            body = "".join(
+                f"<p>{FILLER}Experience with {rng.choice(SKILL_TEXT)} and {rng.choice(SKILL_TEXT)}.</p>"
+                for _ in range(rng.randint(10, 30))
+            )
+            jobs.append(
+                {
+                    "id": job_index,
+                    "title": rng.choice(["Design Lead", "Director of Design", "Creative Director"]),
+                    "body": body,
+                }
+            )
+            companies.append(
+                {
+                    "title": f"Stand-In Company {company_index}",
+                    "alias": f"/company/{self.alias(company_index)}",
+                }
+            )
+        return {"jobs": jobs, "companies": companies}
+
+    def company(self, alias: str) -> dict:
+        fixture = self._fixture(f"companies/{alias}.json")
+        if fixture is not None:
+            return fixture
+        rng = random.Random(f"{self.seed}:{alias}")
+        return {
+            "street_address_1": f"{rng.randint(1, 999)} Broadway",
+            "street_address_2": f"Floor {rng.randint(1, 40)}",
+            "city": "New York",
+            "state": "NY",
+            "zip": "10001",
+            "mission": f"{alias} builds things people like.",
+            "url": f"https://{alias}.example.com",
+            "adjectives": rng.sample(ADJECTIVES, rng.randint(0, 3)),
+            "industries": [{"name": name} for name in rng.sample(INDUSTRIES, 2)],
+            "twitter": f"https://twitter.com/{alias}",
+            "email": f"hello@{alias}.example.com",
+        }
+
+    def contact_page(self, alias: str) -> str:
+        rng = random.Random(f"{self.seed}:{alias}:contact")
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        filler = " ".join(f"<p>{FILLER}</p>" for _ in range(rng.randint(50, 200)))
+        return f"<html><body><h1>Our team</h1>{filler}<p>Head of Design: {first} {last}</p>{filler}</body></html>"
+
+    def search_results(self, query: str, base_url: str) -> list[str]:
+        """Three candidate links per query, cycling through the LinkedIn, contact-page and username-domain paths."""
+        rng = random.Random(f"{self.seed}:{query}")
+        alias = query.split('"')[1].lower().replace(" ", "-") if '"' in query else "unknown"
+        first, last = rng.choice(FIRST).lower(), rng.choice(LAST).lower()
+        links = [
+            f"https://www.linkedin.com/in/{first}-{last}-{rng.randint(100, 999)}",
+            f"{base_url}/contact/Nike-{quote(alias)}",
+            f"https://{first}{last}.com/",
+        ]
+        rng.shuffle(links)
+        return links
+
+    def _fixture(self, relative: str) -> Optional[dict]:
+        if self.fixtures is None:
+            return None
+        fixture = self.fixtures / relative
+        if not fixture.exists():
+            return None
+        return json.loads(fixture.read_text(encoding="utf-8"))
+
+
+class StandIn:
+    """Runs StandInData behind a ThreadingHTTPServer on a free local port. Use as a context manager."""
+
+    def __init__(self, data: StandInData):
+        self.data = data
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url_builtin(self) -> str:
+        return f"{self.base_url}/services/job-retrieval/legacy-jobs"
+
+    @property
+    def url_company(self) -> str:
+        return f"{self.base_url}/companies/alias/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standin.requests += 1
+                url = urlsplit(self.path)
+                params = parse_qs(url.query)
+                if url.path == "/services/job-retrieval/legacy-jobs":
+                    page = int(params.get("page", ["1"])[0])
+                    self._send_json(standin.data.listing(page))
+                elif url.path.startswith("/companies/alias/"):
+                    self._send_json(standin.data.company(unquote(url.path.rsplit("/", 1)[1])))
+                elif url.path.startswith("/contact/"):
+                    alias = unquote(url.path.rsplit("/", 1)[1])
+                    self._send(standin.data.contact_page(alias).encode(), "text/html")
+                elif url.path == "/search":
+                    query = params.get("q", [""])[0]
+                    self._send_json(standin.data.search_results(query, standin.base_url))
+                else:
+                    self.send_error(404)
+
+            def _send_json(self, doc) -> None:
+                self._send(json.dumps(doc).encode(), "application/json")
+
+            def _send(self, body: bytes, content_type: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+class StandInSearch:
+    """A search function for NetworkingAssistant that asks the stand-in's /search endpoint instead of Google."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def __call__(self, query: str) -> Iterable[str]:
+        response = get(f"{self.base_url}/search", params={"q": query}, timeout=10)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,82 @@
+"""Startup benchmark: how long `import main` takes, and which modules it pulls in.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+summarises the self/cumulative import times it reports. Run from the
+repository root:
+
+    python -m benchmarks.startup_importtime --top 25
+    python -m benchmarks.startup_importtime --max-ms 300   # fail if startup regresses
+
+Heavy dependencies (nltk, textblob, googlesearch, tld, bs4, reportlab) are
+imported lazily, so none of them should appear in the report.
+"""
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("nltk", "textblob", "googlesearch", "tld", "bs4", "reportlab")
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure(statement: str = "import main") -> list[ImportTime]:
+    """Imports statement's modules in a fresh interpreter and parses its -X importtime report."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings.append(
+            ImportTime(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip())) // 2,
+            )
+        )
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statement", default="import main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    timings = measure(args.statement)
+    total_ms = sum(t.self_us for t in timings) / 1000
+    print(f"{args.statement!r}: {total_ms:.1f} ms across {len(timings)} modules\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[: args.top]:
+        print(f"{t.cumulative_us / 1000:>14.1f} {t.self_us / 1000:>9.1f}  {t.module}")
+
+    eager = sorted(
+        {t.module for t in timings if t.module.split(".")[0] in HEAVY_MODULES}
+    )
+    if eager:
+        print(f"\nheavy modules imported at startup: {', '.join(eager)}")
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\nstartup took {total_ms:.1f} ms, over the {args.max_ms} ms budget")
+        return 1
+    return 1 if eager else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
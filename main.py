@@ -1,42 +1,154 @@
+import argparse
 from time import perf_counter
 
-from tqdm import tqdm
-
-from scrape.builtin_getter import parse_results
+from scrape.builtin_getter import iter_listing_pages, iter_new_listing_pages
+from scrape.bundle import LetterBundle
+from scrape.cache import TTLCache
 from scrape.configs import read_config
-from scrape.coverletterwriter import CoverLetterWriter
+from scrape.contact_cache import ContactCache
+from scrape.crawl_state import CrawlState
+from scrape.fetch_engine import configure_engine
+from scrape.job_index import JobIndex
+from scrape.journal import CheckpointJournal
 from scrape.log import logger
-from scrape.networkingasst import NetworkingAssistant
+from scrape.metrics import metrics
+from scrape.pipeline import Pipeline
+from scrape.render_pool import RenderPool
+from scrape.result_store import ResultStore
+from scrape.search import SearchQueue
+
 
-config, persona = read_config("./config.json")
-querystring = config.querystring
-builtinnyc = config.url_builtin
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Searches BuiltIn for job listings and writes a cover letter for each of them."
+    )
+    parser.add_argument(
+        "--config",
+        default="./config.json",
+        help="path to the jobscraper config file (default: ./config.json)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the jobs that the checkpoint journal shows a previous run already finished",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="DIR",
+        default=None,
+        help="record per-stage timings and counters, and write them to DIR as metrics.json and metrics.prom",
+    )
+    parser.add_argument(
+        "--save-results",
+        metavar="PATH",
+        default=None,
+        help="save every company and job looked up during the run to PATH as Parquet (needs pyarrow)",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only fetch and write for the jobs posted since the last incremental run",
+    )
+    source.add_argument(
+        "--from-results",
+        metavar="PATH",
+        default=None,
+        help="write cover letters for the results saved at PATH instead of scraping BuiltIn again",
+    )
+    source.add_argument(
+        "--query",
+        default=None,
+        help="write cover letters for the jobs in the local job index that match an FTS5 query, "
+        "e.g. 'job_name:director AND industries:fintech', instead of scraping BuiltIn again",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> None:
+def main(argv=None) -> None:
     """jobscraper takes the provided querystring, searches for job results,
     and for each of those job results generates a cover letter.
     """
-    start = perf_counter()
-    for page in range(1, config.total_pages):
-        page_dict = {"page": page}
-        querystring.update(page_dict)
-        company_collection = parse_results(builtinnyc, querystring, page, config)
-
-        for idx, company in enumerate(
-            tqdm(company_collection, desc="Generating Contacts")
-        ):
-            networkingasst = NetworkingAssistant(company=company, config=config)
-            business_card = networkingasst.gratuitous_schmoozing()
-
-            logger.info(
-                f"Writing cover letter to {business_card.fullname} at {business_card.workplace} for the role of {company_collection[idx].job_name}") # type: ignore
-            coverletter = CoverLetterWriter(company, contact=business_card, persona=persona, config=config)
-            coverletter.write()
-            continue
+    args = parse_args(argv)
+    config, persona = read_config(args.config)
+    querystring = config.querystring
+    builtinnyc = config.url_builtin
 
+    if args.query and not config.index_path:
+        raise SystemExit("--query needs a job index: set index_path in the config.")
+    if args.metrics:
+        metrics.enable()
+
+    job_index = JobIndex(config.index_path) if config.index_path else None
+    if args.query:
+        # searched before anything else is opened, so a bad query fails fast and cleanly
+        try:
+            matches = job_index.search(args.query)
+        except ValueError as error_found:
+            job_index.close()
+            raise SystemExit(f"--query: {error_found}") from None
+        logger.info(f"{len(matches)} indexed jobs match {args.query!r}")
+
+    start = perf_counter()
+    configure_engine(config)
+    company_cache = TTLCache.from_config(config)
+    contact_cache = ContactCache.from_config(config)
+    search_queue = SearchQueue.from_config(config)
+    render_pool = RenderPool(config.render_workers)
+    journal = CheckpointJournal(config.journal_path, resume=args.resume)
+    bundle = LetterBundle.from_config(config)
+    store = ResultStore() if args.save_results else None
+    try:
+        pipeline = Pipeline(
+            config,
+            persona,
+            render_pool=render_pool,
+            cache=company_cache,
+            journal=journal,
+            contact_cache=contact_cache,
+            search=search_queue,
+            bundle=bundle,
+            store=store,
+            index=job_index,
+        )
+        if args.from_results:
+            rendered = pipeline.run_companies(ResultStore.load(args.from_results))
+        elif args.query:
+            rendered = pipeline.run_companies(matches)
+        elif args.incremental:
+            crawl_state = CrawlState(config.crawl_state_path)
+            rendered = pipeline.run(
+                iter_new_listing_pages(builtinnyc, querystring, config, crawl_state)
+            )
+            # only a run that got this far may mark its jobs as seen
+            crawl_state.commit(pipeline.finished)
+        else:
+            listing_pages = iter_listing_pages(builtinnyc, querystring, config)
+            rendered = pipeline.run(listing_pages)
+        if job_index is not None:
+            logger.info(f"Job index: {len(job_index)} jobs in {config.index_path}")
+    finally:
+        # closed even when the run fails, so the archive keeps the letters already in it
+        render_pool.close()
+        search_queue.close()
+        if bundle is not None:
+            bundle.close()
+        journal.close()
+        company_cache.close()
+        contact_cache.close()
+        if job_index is not None:
+            job_index.close()
+    failed = sum(1 for result in rendered if result.error)
+    logger.info(f"Wrote {len(rendered) - failed} cover letters, {failed} failed.")
+    logger.info(f"Company lookup cache: {company_cache.stats()}")
+    logger.info(f"Contact cache: {contact_cache.stats()}")
+    if store is not None:
+        logger.info(f"Saved {len(store)} results to {store.save(args.save_results)}")
     elapsed = perf_counter() - start
     logger.info(f"\n[jobscraper]: Job search finished in {elapsed} seconds.\n") # type: ignore
+    if args.metrics:
+        metrics.observe("run", elapsed)
+        logger.info(f"Metrics written to {', '.join(metrics.dump(args.metrics))}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+from collections import deque
+from functools import lru_cache
+from typing import Iterable
+
+
+class BrandMatcher:
+    """An Aho-Corasick automaton over the brand names, which finds every brand
+    occurring in a piece of text (e.g. a URL) in a single pass over it.
+    """
+
+    def __init__(self, brands: Iterable[str]):
+        self.brands: frozenset[str] = frozenset(
+            brand for brand in (b.strip("\n") for b in brands) if brand
+        )
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[str, ...]] = [()]
+
+        for brand in self.brands:
+            state = 0
+            for char in brand:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state] += (brand,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> set[str]:
+        """find_all returns every brand that occurs in text as a substring.
+
+        Args:
+            text (str): The text to be scanned, e.g. a URL.
+
+        Returns:
+            set[str]: The brands found in text.
+        """
+        found: set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found.update(self._output[state])
+        return found
+
+
+@lru_cache(maxsize=None)
+def get_brand_matcher(brand_names_path: str) -> BrandMatcher:
+    """Reads the brand names file, one brand per line, and builds its BrandMatcher once per process."""
+    with open(brand_names_path, "r", encoding="utf8") as f:
+        return BrandMatcher(f.readlines())
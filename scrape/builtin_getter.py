@@ -1,67 +1,292 @@
-from contextlib import suppress
-from json import JSONDecodeError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
 
-from requests import HTTPError, RequestException
 from tqdm import tqdm
 
-from scrape.company_result import CompanyResult
+from scrape.cache import TTLCache
+from scrape.coalesce import Coalescer
+from scrape.company_result import CompanyResult, intern_strings
 from scrape.configs import JobScrapeConfig
-from scrape.web_scraper import webscrape_results
+from scrape.crawl_state import CrawlState, query_key
+from scrape.journal import job_key
+from scrape.listing_body import ListingBody
+from scrape.log import logger
+from scrape.metrics import metrics
+from scrape.web_scraper import (
+    webscrape_conditional,
+    webscrape_results,
+    webscrape_spooled,
+)
+
+COMPANY_ALIAS_URL = "https://api.builtin.com/companies/alias/"
 
 
 def parse_results(
-    base_url: str, querystring: dict, page: int, config: JobScrapeConfig
+    base_url: str,
+    querystring: dict,
+    page: int,
+    config: JobScrapeConfig,
+    cache: Optional[TTLCache] = None,
 ) -> list[CompanyResult]:
     """Takes the params provided in main.py and generates dataclasses for
     each job listing in BuiltInNYC, the job name, company info, and so forth.
     """
-    company_results = []
     docs = webscrape_results(base_url, querystring=querystring)
-    jobs = [item.get("title") for item in docs["jobs"]]
-    job_desc = [item.get("body") for item in docs["jobs"]]
-    company_names = [item.get("title") for item in docs["companies"]]
-    alii = [item.get("alias") for item in docs["companies"]]
-    for idx, company in enumerate(
-        tqdm(
-            company_names,
+    return parse_listing(docs, page, config, cache=cache)
+
+
+def iter_listing_pages(
+    base_url: str, querystring: dict, config: JobScrapeConfig
+) -> Iterator[tuple[int, Any]]:
+    """Fetches every listing page from 1 up to config.total_pages, at most
+    config.max_concurrent_pages at a time, and yields each (page, listing JSON) pair as soon
+    as it arrives, so that the jobs on the first page can be processed while the rest are
+    still being fetched. The JSON is None for pages that failed.
+    """
+    futures: dict = {}
+    yielded = set()
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(config.max_concurrent_pages, 1),
+            thread_name_prefix="jobscraper-listing",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    fetch_listing_page,
+                    base_url,
+                    {**querystring, "page": page},
+                    config.stream_listings,
+                ): page
+                for page in range(1, config.total_pages)
+            }
+            try:
+                for future in as_completed(futures):
+                    yielded.add(future)
+                    yield futures[future], future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        # if the caller stopped early, close the spooled pages it never got to
+        for future in futures:
+            if future not in yielded and not future.cancelled() and future.exception() is None:
+                docs = future.result()
+                if isinstance(docs, ListingBody):
+                    docs.close()
+
+
+def iter_new_listing_pages(
+    base_url: str, querystring: dict, config: JobScrapeConfig, state: CrawlState
+) -> Iterator[tuple[int, Any]]:
+    """For incremental runs: fetches the listing pages one at a time, newest first, and yields
+    each (page, listing JSON) pair with only the jobs that state has not seen before.
+
+    Pages are requested conditionally, with the ETag and Last-Modified from the last run.
+    Since the listings are sorted by recency, paging stops at the first page that is unchanged,
+    failed, or reaches a job seen before; a run with nothing new fetches a single page.
+    """
+    query = query_key(base_url, querystring)
+    seen = state.seen(query)
+    for page in range(1, config.total_pages):
+        etag, last_modified = state.validators(query, page)
+        with metrics.timer("listing_fetch"):
+            fetched = webscrape_conditional(
+                base_url, {**querystring, "page": page}, etag, last_modified
+            )
+        if fetched.not_modified:
+            logger.info(f"Listing page {page} is unchanged since the last run, stopping here.")
+            return
+        if fetched.docs is None:
+            logger.warning(f"Listing page {page} could not be fetched, stopping here.")
+            return
+        rows = list(iter_listing_rows(fetched.docs, page))
+        new_rows = [
+            row for row in rows if job_key(row.alias, row.job_id, row.job_name) not in seen
+        ]
+        state.record(
+            query,
+            page,
+            [job_key(row.alias, row.job_id, row.job_name) for row in new_rows],
+            fetched.etag,
+            fetched.last_modified,
+        )
+        metrics.inc("listing", "new_jobs", len(new_rows))
+        logger.info(f"Listing page {page}: {len(new_rows)} of {len(rows)} jobs are new.")
+        if new_rows:
+            yield page, _only_jobs(fetched.docs, [row.inner_id for row in new_rows])
+        if not rows or len(new_rows) < len(rows):
+            return
+
+
+def _only_jobs(docs: dict, indices: list[int]) -> dict:
+    """Narrows a page of listing JSON down to the jobs at indices, keeping jobs and companies aligned."""
+    return {
+        **docs,
+        "jobs": [docs["jobs"][idx] for idx in indices],
+        "companies": [docs["companies"][idx] for idx in indices],
+    }
+
+
+def fetch_listing_page(base_url: str, querystring: dict, stream: bool = False) -> Any:
+    """Fetches a single listing page, timed as the listing_fetch stage.
+    With stream, the page is spooled into a ListingBody instead of being decoded whole.
+    """
+    with metrics.timer("listing_fetch"):
+        if stream:
+            return webscrape_spooled(base_url, querystring=querystring)
+        return webscrape_results(base_url, querystring=querystring)
+
+
+@dataclass(frozen=True)
+class ListingRow:
+    """One job from a listing page, before its company has been looked up."""
+
+    page: int
+    inner_id: int
+    alias: str
+    company_name: str
+    job_name: str
+    job_description: str
+    job_id: str = ""
+
+
+def parse_listing(
+    docs: Any,
+    page: int,
+    config: JobScrapeConfig,
+    cache: Optional[TTLCache] = None,
+) -> list[CompanyResult]:
+    """Turns one page of listing JSON into CompanyResult dataclasses,
+    looking up each company's details along the way.
+    """
+    rows = list(iter_listing_rows(docs, page))
+    lookups: Coalescer[dict] = Coalescer("company lookup")
+    return [
+        build_company_result(
+            row, cache=cache, lookups=lookups, base_url=config.url_company
+        )
+        for row in tqdm(
+            rows,
             desc=f"Evaluating Companies | Bundle {page} of {config.total_pages}",
         )
-    ):
-        alias = alii[idx]
-        alias = alias[9:]
-        company_dict = company_lookup(alias)
-        results = CompanyResult(
+    ]
+
+
+def iter_listing_rows(docs: Any, page: int) -> Iterator[ListingRow]:
+    """Yields a ListingRow for each job in one page of listing JSON, pairing each job with
+    its company as it goes. docs is either the decoded JSON or a spooled ListingBody,
+    which is decoded one job at a time and closed once its jobs have been read.
+    """
+    if not docs:
+        logger.warning(f"No listings were returned for page {page}, skipping it.")
+        return
+    if isinstance(docs, ListingBody):
+        try:
+            companies = docs.companies()
+            yield from _pair_jobs(docs.jobs(), companies, page)
+        finally:
+            docs.close()
+        return
+    yield from _pair_jobs(docs["jobs"], docs["companies"], page)
+
+
+def _pair_jobs(
+    jobs: Iterable[dict], companies: Iterable[dict], page: int
+) -> Iterator[ListingRow]:
+    for idx, (job, company) in enumerate(zip(jobs, companies)):
+        yield ListingRow(
+            page=page,
             inner_id=idx,
-            alias=alias,
-            company_name=company,
-            company_desc=company_dict.get("mission"),
-            job_name=jobs[idx],
-            job_description=job_desc[idx],
-            industries=company_dict.get("industries"),
-            street_address=company_dict.get("street_address"),
-            suite=company_dict.get("suite"),
-            city=company_dict.get("city"),
-            state=company_dict.get("state"),
-            zip=company_dict.get("zip"),
-            adjectives=company_dict.get("adjectives"),
-            url=company_dict.get("url"),
-            twitter=company_dict.get("twitter"),
-            email=company_dict.get("email"),
+            alias=(company.get("alias") or "")[9:],
+            company_name=company.get("title"),
+            job_name=job.get("title"),
+            job_description=job.get("body"),
+            job_id=str(job.get("id") or ""),
         )
-        company_results.append(results)
-    return company_results
 
 
-def company_lookup(company_alias: str) -> dict:
+def build_company_result(
+    row: ListingRow,
+    cache: Optional[TTLCache] = None,
+    lookups: Optional[Coalescer] = None,
+    base_url: str = COMPANY_ALIAS_URL,
+) -> CompanyResult:
+    """Looks up the company behind a ListingRow and combines the two into a CompanyResult.
+    With a Coalescer, each company is only looked up once however many of its jobs are listed.
+    """
+    if lookups is not None:
+        company_dict = lookups.get(
+            row.alias,
+            lambda: company_lookup(row.alias, cache=cache, base_url=base_url),
+        )
+    else:
+        company_dict = company_lookup(row.alias, cache=cache, base_url=base_url)
+    return make_company_result(row, company_dict)
+
+
+def make_company_result(row: ListingRow, company_dict: Optional[dict]) -> CompanyResult:
+    """Combines a ListingRow with its company's looked-up details into a CompanyResult.
+    Industries and adjectives are interned, so the jobs at one company share them.
+    """
+    company_dict = company_dict or {}
+    return CompanyResult(
+        inner_id=row.inner_id,
+        alias=row.alias,
+        company_name=row.company_name,
+        company_desc=company_dict.get("mission"),
+        job_name=row.job_name,
+        job_description=row.job_description,
+        industries=intern_strings(company_dict.get("industries")),
+        street_address=company_dict.get("street_address"),
+        suite=company_dict.get("suite"),
+        city=company_dict.get("city"),
+        state=company_dict.get("state"),
+        zip=company_dict.get("zip"),
+        adjectives=intern_strings(company_dict.get("adjectives")),
+        url=company_dict.get("url"),
+        twitter=company_dict.get("twitter"),
+        email=company_dict.get("email"),
+        job_id=row.job_id,
+    )
+
+
+def company_lookup(
+    company_alias: str,
+    cache: Optional[TTLCache] = None,
+    base_url: str = COMPANY_ALIAS_URL,
+) -> dict:
     """Looks up the company JSON in BuiltInNYC. It passes this along to the superceding parse_results method,
-    which places it within the CompanyResult dataclass.
+    which places it within the CompanyResult dataclass. When a cache is given, repeat lookups of the same
+    alias are answered from it instead of from the network.
+    """
+    if cache is not None:
+        return cache.get_or_fetch(
+            company_alias, lambda: fetch_company(company_alias, base_url=base_url)
+        )
+    return fetch_company(company_alias, base_url=base_url)
+
+
+def fetch_company(company_alias: str, base_url: str = COMPANY_ALIAS_URL) -> Optional[dict]:
+    """Fetches and flattens the company JSON for company_alias from the BuiltIn API.
+    If the company can't be looked up, that is logged and None is returned, so its
+    letters go out without the company's details rather than the run stopping.
     """
-    with suppress(
-        JSONDecodeError, RequestException, HTTPError, TypeError, AttributeError
-    ):
-        company_page_url = f"https://api.builtin.com/companies/alias/{company_alias}"
+    with metrics.timer("company_lookup"):
+        company_page_url = f"{base_url}{company_alias}"
         comp_docs = webscrape_results(company_page_url, querystring={"region_id": "5"})
-        industries = [item.get("name") for item in comp_docs["industries"]]
+        if not comp_docs:
+            logger.warning(
+                f"Could not look up {company_alias}; its cover letters will leave out the company's details."
+            )
+            metrics.inc("company_lookup", "failed")
+            return None
+        try:
+            industries = [item.get("name") for item in comp_docs.get("industries") or []]
+        except (TypeError, AttributeError) as error_found:
+            logger.warning(f"Unexpected company JSON for {company_alias}: {error_found!r}")
+            metrics.inc("company_lookup", "failed")
+            return None
         data = {
             "street_address": comp_docs.get("street_address_1"),
             "suite": comp_docs.get("street_address_2"),
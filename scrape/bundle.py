@@ -0,0 +1,178 @@
+import datetime
+import json
+import tarfile
+import threading
+import zipfile
+from io import BytesIO
+from time import time
+from typing import Optional
+
+from scrape.configs import JobScrapeConfig
+from scrape.dir import export_path, make_export_dir
+from scrape.log import logger
+from scrape.render_context import get_render_context
+from scrape.render_pool import RenderResult
+
+EXPORT_MODES = ("files", "zip", "tar")
+
+
+class LetterBundle:
+    """Collects a run's cover letters into one archive and/or one combined PDF,
+    instead of a directory and two small files per letter.
+
+    The archive, a zip or an uncompressed tar, is written as a single sequential stream:
+    each letter's PDF and TXT are appended as soon as they are rendered, and a
+    manifest.json indexing every letter is appended when the bundle is closed. The
+    combined PDF starts each letter on a new page, in the order the letters were
+    rendered, and is built in one pass when the bundle is closed.
+    """
+
+    def __init__(
+        self,
+        config: JobScrapeConfig,
+        archive_path: Optional[str] = None,
+        archive_format: str = "zip",
+        combined_pdf_path: Optional[str] = None,
+    ):
+        self.config = config
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self.combined_pdf_path = combined_pdf_path
+        self.manifest: list[dict] = []
+        self._names: set[str] = set()
+        self._letters: list[list[tuple[str, str]]] = []
+        self._lock = threading.Lock()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+
+        if archive_path is not None:
+            make_export_dir(archive_path)
+            if archive_format == "zip":
+                self._zip = zipfile.ZipFile(archive_path, "w")
+            elif archive_format == "tar":
+                self._tar = tarfile.open(archive_path, "w")
+            else:
+                raise ValueError(
+                    f"Unknown archive format {archive_format!r}, expected 'zip' or 'tar'"
+                )
+
+    @classmethod
+    def from_config(cls, config: JobScrapeConfig) -> Optional["LetterBundle"]:
+        """from_config opens the bundle that config.export_mode and config.export_combined_pdf ask for.
+        Each run gets its own, named {date}_{export_dir}_{time}, so a resumed run never overwrites the last one.
+
+        Returns:
+            Optional[LetterBundle]: the bundle, or None if letters are exported as separate files only.
+        """
+        if config.export_mode not in EXPORT_MODES:
+            raise ValueError(
+                f"Unknown export_mode {config.export_mode!r}, expected one of {', '.join(EXPORT_MODES)}"
+            )
+        if config.export_mode == "files" and not config.export_combined_pdf:
+            return None
+        stem = export_path(
+            f"{datetime.datetime.now().strftime('%y%m%d_%H%M%S')}_{config.export_dir}"
+        )
+        return cls(
+            config,
+            archive_path=None if config.export_mode == "files" else f"{stem}.{config.export_mode}",
+            archive_format=config.export_mode,
+            combined_pdf_path=f"{stem}.pdf" if config.export_combined_pdf else None,
+        )
+
+    def add(self, result: RenderResult) -> None:
+        """add appends a rendered letter to the bundle. Once in the archive, its file
+        contents are dropped from the result, whose paths then name them within the archive.
+        """
+        if result.error:
+            return
+        with self._lock:
+            files = result.paths
+            if self._zip is not None or self._tar is not None:
+                files = []
+                for name, data in result.files.items():
+                    name = self._unique_name(name)
+                    self._write(name, data)
+                    files.append(name)
+                result.paths = [f"{self.archive_path}::{name}" for name in files]
+                result.files = {}
+            if result.paragraphs:
+                self._letters.append(result.paragraphs)
+                result.paragraphs = []
+            self.manifest.append(
+                {
+                    "company_name": result.company_name,
+                    "job_name": result.job_name,
+                    "alias": result.alias,
+                    "job_id": result.job_id,
+                    "files": files,
+                }
+            )
+
+    def _unique_name(self, name: str) -> str:
+        """Returns name, or name with a numbered suffix if the archive already holds an entry by that name."""
+        unique = name
+        stem, dot, suffix = name.rpartition(".")
+        copy = 1
+        while unique in self._names:
+            copy += 1
+            unique = f"{stem}_{copy}.{suffix}" if dot else f"{name}_{copy}"
+        if unique != name:
+            logger.warning(f"{name} is already in {self.archive_path}, adding it as {unique}")
+        self._names.add(unique)
+        return unique
+
+    def _write(self, name: str, data: bytes) -> None:
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, datetime.datetime.now().timetuple()[:6])
+            # the PDFs are compressed already; deflating them again only costs time
+            info.compress_type = (
+                zipfile.ZIP_STORED if name.endswith(".pdf") else zipfile.ZIP_DEFLATED
+            )
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time())
+            self._tar.addfile(info, BytesIO(data))
+
+    def close(self) -> list[str]:
+        """close writes the manifest and the combined PDF, and closes the archive.
+
+        Returns:
+            list[str]: the paths of the archive and the combined PDF, as written.
+        """
+        written = []
+        with self._lock:
+            if self._zip is not None or self._tar is not None:
+                self._write(
+                    "manifest.json",
+                    json.dumps({"letters": self.manifest}, indent=2).encode("utf-8"),
+                )
+                if self._zip is not None:
+                    self._zip.close()
+                else:
+                    self._tar.close()
+                written.append(self.archive_path)
+            if self.combined_pdf_path is not None and self._letters:
+                self._build_combined_pdf()
+                written.append(self.combined_pdf_path)
+        logger.info(f"Bundled {len(self.manifest)} cover letters into {', '.join(written)}")
+        return written
+
+    def _build_combined_pdf(self) -> None:
+        from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+        render_context = get_render_context(self.config)
+        styles = render_context.styles
+        story: list = []
+        for paragraphs in self._letters:
+            if story:
+                story.append(PageBreak())
+            story += [Paragraph(markup, style=styles[style]) for markup, style in paragraphs]
+        make_export_dir(self.combined_pdf_path)
+        SimpleDocTemplate(
+            self.combined_pdf_path,
+            **render_context.doc_settings,
+            title=f"{self.config.export_dir} cover letters",
+        ).build(story)
@@ -0,0 +1,176 @@
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs, path
+from time import time
+from typing import Any, Callable, Optional
+
+from scrape.configs import JobScrapeConfig
+from scrape.log import logger
+from scrape.metrics import metrics
+
+
+class TTLCache:
+    """A persistent key-value cache of JSON documents, backed by a SQLite table.
+
+    Entries older than ttl_seconds are stale. A stale entry is either refetched
+    before it is returned or, with refresh_stale, returned as-is while a
+    background thread refetches it. Once the table holds more than max_entries,
+    the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        table: str = "company_lookup",
+        ttl_seconds: float = 30 * 24 * 3600,
+        max_entries: int = 10000,
+        refresh_stale: bool = False,
+    ):
+        self.db_path = db_path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.refresh_stale = refresh_stale
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+        directory = path.dirname(path.realpath(db_path))
+        makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)"
+        )
+        self._conn.commit()
+        self._refreshing: set[str] = set()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config: JobScrapeConfig, table: str = "company_lookup"):
+        return cls(
+            config.cache_path,
+            table=table,
+            ttl_seconds=config.cache_ttl_days * 24 * 3600,
+            max_entries=config.cache_max_entries,
+            refresh_stale=config.cache_refresh_stale,
+        )
+
+    def get(self, key: str) -> tuple[Optional[Any], bool]:
+        """get reads an entry without fetching anything or touching the counters.
+
+        Returns:
+            tuple[Optional[Any], bool]: the cached value, or None, and whether it is still fresh.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT payload, fetched_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time(), key)
+            )
+            self._conn.commit()
+        payload, fetched_at = row
+        return json.loads(payload), time() - fetched_at < self.ttl_seconds
+
+    def set(self, key: str, value: Any) -> None:
+        """set stores value under key, then evicts the least recently used entries over max_entries."""
+        now = time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, payload, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            (count,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN \
+                    (SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def get_or_fetch(self, key: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """get_or_fetch returns the cached value for key, calling loader to fill or refresh it when needed.
+        Empty results from loader are never cached.
+
+        Args:
+            key (str): the cache key, e.g. a company alias.
+            loader (Callable[[], Optional[Any]]): fetches a fresh value for key.
+
+        Returns:
+            Optional[Any]: the cached or freshly loaded value.
+        """
+        value, fresh = self.get(key)
+        if value is not None and fresh:
+            self.hits += 1
+            metrics.inc(self.table, "cache_hits")
+            return value
+
+        if value is not None and self.refresh_stale:
+            self.stale_hits += 1
+            metrics.inc(self.table, "cache_stale_hits")
+            self._refresh_in_background(key, loader)
+            return value
+
+        self.misses += 1
+        metrics.inc(self.table, "cache_misses")
+        loaded = loader()
+        if loaded:
+            self.set(key, loaded)
+            return loaded
+        return value
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Optional[Any]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix=f"jobscraper-{self.table}"
+                )
+
+        def refresh() -> None:
+            try:
+                loaded = loader()
+                if loaded:
+                    self.set(key, loaded)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """close waits for any background refreshes, then closes the database."""
+        if self._refresher is not None:
+            self._refresher.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+        logger.debug(f"{self.table} cache closed: {self.stats()}")
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Coalescer(Generic[T]):
+    """Coalescer makes sure that each key is only worked on once per run.
+
+    The first call for a key runs the work; any call for the same key made while that
+    work is in flight waits for it and shares its result, and later calls reuse the
+    stored result. Failures are not stored, so a later call for the key tries again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, work: Callable[[], T]) -> T:
+        """get returns the result of work for key, running work only if no other call already has.
+
+        Args:
+            key (str): what the work is about, e.g. a company alias.
+            work (Callable[[], T]): produces the result for key.
+
+        Returns:
+            T: the shared result for key.
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self.executions += 1
+
+        if owner:
+            try:
+                future.set_result(work())
+            except BaseException as error_found:
+                with self._lock:
+                    del self._futures[key]
+                future.set_exception(error_found)
+        return future.result()
+
+    @property
+    def saved(self) -> int:
+        return self.calls - self.executions
+
+    def summary(self) -> str:
+        return f"{self.name}: {self.calls} requested, {self.executions} performed, {self.saved} saved"
@@ -1,7 +1,22 @@
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Optional
 
+_shared_tuples: dict[tuple[str, ...], tuple[str, ...]] = {}
 
-@dataclass(frozen=True, order=True)
+
+def intern_strings(values: Optional[Iterable[str]]) -> tuple[str, ...]:
+    """intern_strings turns a company's industries or adjectives into an interned tuple.
+    BuiltIn draws both from a small vocabulary, so every company with the same ones
+    shares one tuple of the same strings instead of holding a list of its own.
+    """
+    if not values:
+        return ()
+    key = tuple(sys.intern(str(value)) for value in values if value)
+    return _shared_tuples.setdefault(key, key)
+
+
+@dataclass(frozen=True, order=True, slots=True)
 class CompanyResult:
     ''' dataclass of the company
     '''
@@ -19,5 +34,6 @@ class CompanyResult:
     city: str
     state: str
     zip: str
-    industries: list[str] = field(default_factory=list)
-    adjectives: list[str] = field(default_factory=list)
+    industries: tuple[str, ...] = ()
+    adjectives: tuple[str, ...] = ()
+    job_id: str = ""
@@ -38,6 +38,46 @@ class JobScrapeConfig:
     excitement_words: list[str] = field(default_factory=list)
     querystring: dict = field(default_factory=dict)
     persona: dict = field(default_factory=dict)
+    url_company: str = "https://api.builtin.com/companies/alias/"
+    requests_per_second: float = 0.5
+    burst_per_host: int = 8
+    max_concurrency: int = 8
+    max_concurrent_pages: int = 8
+    stream_listings: bool = True
+    max_requests_per_second: float = 4.0
+    min_requests_per_second: float = 0.05
+    rate_increase: float = 0.05
+    max_retries: int = 3
+    retry_budget_ratio: float = 0.2
+    backoff_base: float = 0.5
+    backoff_cap: float = 30.0
+    circuit_failures: int = 5
+    circuit_cooldown: float = 60.0
+    cache_path: str = "./.jobscraper_cache.sqlite3"
+    cache_ttl_days: float = 30
+    cache_max_entries: int = 10000
+    cache_refresh_stale: bool = False
+    contact_cache_path: str = "./.jobscraper_contacts.sqlite3"
+    contact_ttl_days: float = 60
+    contact_min_confidence: float = 0.5
+    search_backend: str = "google"
+    search_url: str = ""
+    search_params: dict = field(default_factory=dict)
+    search_concurrency: int = 4
+    search_rate: float = 0.25
+    search_burst: int = 1
+    page_source_max_bytes: int = 512000
+    relevance_threshold: float = 0.0
+    relevance_top_k: int = 0
+    render_workers: int = 0
+    pipeline_queue_size: int = 8
+    lookup_workers: int = 4
+    contact_workers: int = 1
+    journal_path: str = "./.jobscraper_journal.jsonl"
+    index_path: str = "./.jobscraper_index.sqlite3"
+    crawl_state_path: str = "./.jobscraper_crawl_state.json"
+    export_mode: str = "files"
+    export_combined_pdf: bool = False
 
 
 def read_config(config_file: str):
@@ -0,0 +1,72 @@
+from dataclasses import asdict
+from typing import Optional
+
+from scrape.cache import TTLCache
+from scrape.configs import JobScrapeConfig
+from scrape.metrics import metrics
+from scrape.networkingasst import BusinessCard
+
+
+class ContactCache:
+    """A persistent cache of resolved contacts, keyed by company alias.
+
+    Each entry holds the BusinessCard, its confidence score and the candidate links it
+    was resolved from. A cached contact is only reused while it is fresh and at least
+    min_confidence sure; new, expired and low-confidence companies are searched again.
+    """
+
+    def __init__(self, cache: TTLCache, min_confidence: float = 0.5):
+        self.cache = cache
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self.low_confidence = 0
+
+    @classmethod
+    def from_config(cls, config: JobScrapeConfig):
+        # a file of its own: a second connection to the company cache's file would
+        # contend with it for SQLite's write lock
+        cache = TTLCache(
+            config.contact_cache_path,
+            table="contacts",
+            ttl_seconds=config.contact_ttl_days * 24 * 3600,
+            max_entries=config.cache_max_entries,
+        )
+        return cls(cache, min_confidence=config.contact_min_confidence)
+
+    def usable(self, alias: str) -> bool:
+        """usable tells whether lookup would return a contact for alias, without counting it as a lookup."""
+        entry, fresh = self.cache.get(alias)
+        return entry is not None and fresh and entry["card"]["confidence"] >= self.min_confidence
+
+    def lookup(self, alias: str) -> Optional[BusinessCard]:
+        """lookup returns the cached contact for alias, or None if the company needs searching again."""
+        entry, fresh = self.cache.get(alias)
+        if entry is None or not fresh:
+            self.misses += 1
+            metrics.inc("contacts", "cache_misses")
+            return None
+        if entry["card"]["confidence"] < self.min_confidence:
+            self.low_confidence += 1
+            metrics.inc("contacts", "cache_low_confidence")
+            return None
+        self.hits += 1
+        metrics.inc("contacts", "cache_hits")
+        return BusinessCard(**entry["card"])
+
+    def store(self, alias: str, card: BusinessCard, links: list[str]) -> None:
+        """store caches card for alias, unless a fresh entry is already more confident."""
+        entry, fresh = self.cache.get(alias)
+        if entry is not None and fresh and entry["card"]["confidence"] > card.confidence:
+            return
+        self.cache.set(alias, {"card": asdict(card), "links": list(links)})
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "low_confidence": self.low_confidence,
+        }
+
+    def close(self) -> None:
+        self.cache.close()
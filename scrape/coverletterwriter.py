@@ -1,24 +1,17 @@
 import datetime
 import random
-
-import reportlab.rl_config
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import Paragraph, SimpleDocTemplate
-from textblob import TextBlob
+from io import BytesIO
+from time import perf_counter
+from typing import IO, Union
 
 from scrape.company_result import CompanyResult
 from scrape.configs import JobScrapeConfig, PersonaConfig
-from scrape.dir import change_dir
+from scrape.dir import export_path, make_export_dir
 from scrape.networkingasst import BusinessCard
+from scrape.phrase_matcher import get_persona_matcher
+from scrape.render_context import get_render_context
 from scrape.striptags import strip_tags
 
-reportlab.rl_config.warnOnMissingFontGlyphs = 0
-
-
 now = datetime.datetime.now()
 date = now.strftime("%y%m%d")
 
@@ -39,11 +32,19 @@ class CoverLetterWriter:
         self.persona = persona
         self.config = config
         self.hiring_manager = f"{self.contact.greeting} {self.contact.fullname}"
-        self.pdfmetrics = pdfmetrics
         self.reference = "BuiltInNYC"
         self.letter_date = now.strftime("%B %d, %Y")
         self.letter_title = f"{date}_{self.company.company_name}_{self.persona.name}_{random.randint(0,100)}.pdf"
+        self.txt_title = f"{date}_{self.company.company_name}_CoverLetter.txt"
         self.export_dir = f"{date}_{config.export_dir}"
+        # one directory per job, so several jobs at one company never share a file
+        self.job_dir = str(self.company.job_id or self.company.inner_id)
+        self.pdf_path = export_path(
+            self.export_dir, self.company.company_name, self.job_dir, self.letter_title
+        )
+        self.txt_path = export_path(
+            self.export_dir, self.company.company_name, self.job_dir, self.txt_title
+        )
 
         self.address: str = ""
         self.intro: str = ""
@@ -53,47 +54,78 @@ class CoverLetterWriter:
         self.close: str = ""
         self.whole_letter: str = ""
 
-        self.cover_letter = SimpleDocTemplate(
-            self.letter_title,
-            pagesize=letter,
-            rightMargin=1 * inch,
-            leftMargin=1 * inch,
-            topMargin=1.25 * inch,
-            bottomMargin=1.25 * inch,
+        self.render_context = get_render_context(config)
+        self.styles = self.render_context.styles
+
+        self.cover_letter = self.doc_template(self.pdf_path)
+        self.cl_flowables: list = []
+        self.timings: dict[str, float] = {}
+
+    def doc_template(self, target: Union[str, IO[bytes]]):
+        """doc_template sets up the letter's SimpleDocTemplate, writing to a path or to a binary stream."""
+        from reportlab.platypus import SimpleDocTemplate
+
+        return SimpleDocTemplate(
+            target,
+            **self.render_context.doc_settings,
             title=self.letter_title,
             author=self.persona.name,
             creator=self.persona.name,
             subject=f"{self.persona.name}'s Cover Letter for {self.company.company_name}",
         )
-        self.cl_flowables: list = []
-        self.styles = getSampleStyleSheet()
 
     def write(self):
-        """write _summary_"""
-        self.register_fonts()
-        self.add_styles()
+        """write constructs the letter and writes it as a PDF and a TXT file
+        to {date}_{export_dir}/{company_name}/{job_id}/, or the job's inner_id if it has no job_id.
+
+        Returns:
+            list[str]: the absolute paths of the files written.
+        """
         self.letter_construction()
+        make_export_dir(self.pdf_path)
+        start = perf_counter()
+        self.make_coverletter_pdf()
+        self.timings["pdf_render"] = perf_counter() - start
+        start = perf_counter()
+        self.make_coverletter_txt()
+        self.timings["txt_write"] = perf_counter() - start
+        return [self.pdf_path, self.txt_path]
+
+    def render(self) -> dict[str, bytes]:
+        """render constructs the letter and renders it as a PDF and a TXT file in memory,
+        for exports that bundle every letter into one archive instead of writing files.
 
-        with change_dir(self.export_dir):
-            with change_dir(f"{self.company.company_name}"):
-                self.make_coverletter_pdf()
-                self.make_coverletter_txt()
+        Returns:
+            dict[str, bytes]: the contents of each file, by its name within the archive:
+                {company_name}/{job_id}/{file_name}, or the job's inner_id if it has no job_id.
+        """
+        self.letter_construction()
+        start = perf_counter()
+        pdf = BytesIO()
+        self.make_coverletter_pdf(self.doc_template(pdf))
+        self.timings["pdf_render"] = perf_counter() - start
+        start = perf_counter()
+        txt = self.letter_text().encode("utf-8")
+        self.timings["txt_write"] = perf_counter() - start
+        job_dir = f"{self.company.company_name}/{self.job_dir}"
+        return {
+            f"{job_dir}/{self.letter_title}": pdf.getvalue(),
+            f"{job_dir}/{self.txt_title}": txt,
+        }
 
     def compute_proficiency_matches(self):
-        """compute_proficiency_matches _summary_
+        """compute_proficiency_matches finds the persona's skills and tools that the job description asks for.
 
         Returns:
-            _type_: _description_
+            str: a sentence naming the matched skills and tools.
         """
-        desc: str = strip_tags(self.company.job_description)
-        duties: set = {(TextBlob(desc).noun_phrases)}
-        skills: set = {self.persona.skills}
-        tools: set = {self.persona.tools}
-        skills_matches: set[str] = duties.intersection(skills)
-        tools_matches: set[str] = duties.intersection(tools)
+        desc: str = strip_tags(self.company.job_description or "")
+        matches = get_persona_matcher(self.persona).match(desc)
+        skills_matches: list[str] = matches["skills"]
+        tools_matches: list[str] = matches["tools"]
 
-        matched: str = str(skills_matches).strip("}{''][").replace("'", "")
-        these_tools: str = str(tools_matches).strip("}{''][").title()
+        matched: str = ", ".join(skills_matches)
+        these_tools: str = ", ".join(tools_matches).title()
 
         if skills_matches and tools_matches:
             return f"As requested on {self.reference}, \
@@ -118,23 +150,27 @@ class CoverLetterWriter:
         Returns:
             str: _description_
         """
-        industry_type: str = f"{self.company.industries[0].lower()} industry"
-        if len(self.company.adjectives) == 0:
+        industries = self.company.industries or []
+        industry_type: str = (
+            f"{industries[0].lower()} industry" if industries else "industry"
+        )
+        adjectives = self.company.adjectives or []
+        if len(adjectives) == 0:
             return f"I've heard great things about {self.company.company_name}'s impact on the {industry_type}."
 
-        elif len(self.company.adjectives) == 1:
+        elif len(adjectives) == 1:
             return f"I've heard great things about {self.company.company_name}'s impact on the {industry_type}, \
-                along with its reputation for being {self.company.adjectives[0].lower()}."
+                along with its reputation for being {adjectives[0].lower()}."
 
-        elif len(self.company.adjectives) == 2:
+        elif len(adjectives) == 2:
             return f"I've heard great things about {self.company.company_name}'s impact on the {industry_type}, \
-                along with its reputation for being {self.company.adjectives[0].lower()} and {self.company.adjectives[1].lower()}."
+                along with its reputation for being {adjectives[0].lower()} and {adjectives[1].lower()}."
 
-        elif len(self.company.adjectives) >= 3:
+        elif len(adjectives) >= 3:
             return f"I've heard great things about {self.company.company_name}'s impact on the {industry_type}, \
-                along with its reputation for being {self.company.adjectives[1].lower()}, \
-                    {self.company.adjectives[2].lower()}, and \
-                    {self.company.adjectives[0].lower()}."
+                along with its reputation for being {adjectives[1].lower()}, \
+                    {adjectives[2].lower()}, and \
+                    {adjectives[0].lower()}."
 
     def letter_construction(self):
         """The collection of strings and variables that make up the copy of the cover letter."""
@@ -171,67 +207,39 @@ class CoverLetterWriter:
 
         self.whole_letter: str = f"{self.address} {self.intro} {self.salut} {self.body} {self.outro} {self.close}"
 
-    def register_fonts(self):
-        """This registers the fonts for use in the PDF, querying them from the config.json file."""
-        self.pdfmetrics.registerFont(TTFont("IBMPlex", self.config.font_regular))
-        self.pdfmetrics.registerFont(TTFont("IBMPlexBd", self.config.font_bold))
-        self.pdfmetrics.registerFont(TTFont("IBMPlexIt", self.config.font_italic))
-        self.pdfmetrics.registerFont(TTFont("IBMPlexBI", self.config.font_bolditalic))
-        self.pdfmetrics.registerFontFamily(
-            "IBMPlex",
-            normal="IBMPlex",
-            bold="IBMPlexBd",
-            italic="IBMPlexIT",
-            boldItalic="IBMPlexBI",
-        )
-
-    def add_styles(self):
-        """This registers the styles for use in the PDF."""
-        self.styles.add(
-            ParagraphStyle(
-                "Main",
-                parent=self.styles["Normal"],
-                fontName="IBMPlex",
-                spaceBefore=16,
-                fontSize=12,
-                leading=16,
-                firstLineIndent=0,
-            )
-        )
-
-        self.styles.add(
-            ParagraphStyle("MainBody", parent=self.styles["Main"], firstLineIndent=16)
-        )
-
-        self.styles.add(
-            ParagraphStyle(
-                "ListItem",
-                parent=self.styles["Main"],
-                spaceBefore=8,
-                firstLineIndent=16,
-                bulletText="•",
-            )
-        )
+    def letter_text(self) -> str:
+        """letter_text is the cover letter as plain text."""
+        self.whole_letter = strip_tags(self.whole_letter)
+        self.whole_letter = self.whole_letter.replace("           ", "\n")
+        return self.whole_letter
 
     def make_coverletter_txt(self):
         """This creates the cover letter as a .txt file."""
-        self.whole_letter = strip_tags(self.whole_letter)
-        self.whole_letter = self.whole_letter.replace("           ", "\n")
+        with open(self.txt_path, "w", encoding="utf-8") as f:
+            f.write(self.letter_text())
 
-        with open(
-            f"{date}_{self.company.company_name}_CoverLetter.txt", "w", encoding="utf-8"
-        ) as f:
-            f.write(self.whole_letter)
+    def paragraphs(self) -> list[tuple[str, str]]:
+        """paragraphs lists the letter's paragraphs as (markup, style name) pairs,
+        which are plain strings, so they can be sent back from a render worker.
+        """
+        return [
+            (self.address, "Main"),
+            (self.intro, "Main"),
+            (self.salut, "Main"),
+            (self.body, "MainBody"),
+            (self.outro, "MainBody"),
+            (self.close, "Main"),
+        ]
+
+    def make_coverletter_pdf(self, doc=None):
+        """This creates the cover letter as .pdf using the ReportLab PDF Library,
+        in the letter's own file unless given another SimpleDocTemplate.
+        """
+        from reportlab.platypus import Paragraph
 
-    def make_coverletter_pdf(self):
-        """This creates the cover letter as .pdf using the ReportLab PDF Library."""
         self.cl_flowables = [
-            Paragraph(self.address, style=self.styles["Main"]),
-            Paragraph(self.intro, style=self.styles["Main"]),
-            Paragraph(self.salut, style=self.styles["Main"]),
-            Paragraph(self.body, style=self.styles["MainBody"]),
-            Paragraph(self.outro, style=self.styles["MainBody"]),
-            Paragraph(self.close, style=self.styles["Main"]),
+            Paragraph(markup, style=self.styles[style])
+            for markup, style in self.paragraphs()
         ]
 
-        return self.cover_letter.build(self.cl_flowables)
+        return (doc or self.cover_letter).build(self.cl_flowables)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+from os import makedirs, path, replace
+from time import time
+from typing import Container, Optional
+
+from scrape.log import logger
+
+
+def query_key(base_url: str, querystring: dict) -> str:
+    """The identity of one listing query: its URL and querystring, whatever the page."""
+    params = {key: value for key, value in querystring.items() if key != "page"}
+    raw = json.dumps([base_url, params], sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class CrawlState:
+    """Remembers, per listing query, the jobs already seen and each page's ETag and
+    Last-Modified, so that an incremental run only fetches and processes new postings.
+
+    New jobs and validators are held back until commit(), which is called once the run
+    has finished with them, so a run that crashes halfway sees the same jobs as new again.
+    A job is only remembered once the run has finished with it, and a page's validators
+    only once the run has finished with all of its new jobs, so failed jobs are retried.
+    Only the newest max_seen jobs are remembered per query.
+    """
+
+    def __init__(self, state_path: str, max_seen: int = 10000):
+        self.state_path = state_path
+        self.max_seen = max_seen
+        self._queries: dict[str, dict] = {}
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    self._queries = json.load(f)
+            except (OSError, json.JSONDecodeError) as error_found:
+                logger.warning(f"Ignoring unreadable crawl state {state_path}: {error_found!r}")
+
+    def seen(self, query: str) -> frozenset[str]:
+        """seen is every job key remembered for query, as of the last commit."""
+        with self._lock:
+            return frozenset(self._queries.get(query, {}).get("seen", ()))
+
+    def validators(self, query: str, page: int) -> tuple[Optional[str], Optional[str]]:
+        """validators returns the (ETag, Last-Modified) of a page from the last committed run."""
+        with self._lock:
+            stored = self._queries.get(query, {}).get("validators", {}).get(str(page), {})
+        return stored.get("etag"), stored.get("last_modified")
+
+    def record(
+        self,
+        query: str,
+        page: int,
+        new_jobs: list[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """record notes a page's new jobs and validators, to be remembered on commit()."""
+        with self._lock:
+            pending = self._pending.setdefault(query, {})
+            pending[page] = {"jobs": list(new_jobs), "etag": etag, "last_modified": last_modified}
+
+    def commit(self, finished: Optional[Container[str]] = None) -> None:
+        """commit merges the jobs and validators recorded this run into the state file.
+
+        Args:
+            finished (Optional[Container[str]]): the job keys the run has finished with,
+                e.g. Pipeline.finished. Jobs not in it stay new for the next run, and so do
+                the validators of their pages. Defaults to every recorded job.
+        """
+        with self._lock:
+            for query, pages in self._pending.items():
+                stored = self._queries.setdefault(query, {"seen": [], "validators": {}})
+                # newest first, as the listings are sorted by recency
+                done: list[str] = []
+                for page in sorted(pages):
+                    recorded = pages[page]
+                    page_done = [
+                        key for key in recorded["jobs"] if finished is None or key in finished
+                    ]
+                    done += page_done
+                    if len(page_done) < len(recorded["jobs"]):
+                        stored["validators"].pop(str(page), None)
+                    elif recorded["etag"] or recorded["last_modified"]:
+                        stored["validators"][str(page)] = {
+                            "etag": recorded["etag"],
+                            "last_modified": recorded["last_modified"],
+                        }
+                new = set(done)
+                seen = done + [key for key in stored["seen"] if key not in new]
+                stored["seen"] = seen[: self.max_seen]
+                stored["updated_at"] = time()
+            self._pending.clear()
+            makedirs(path.dirname(path.realpath(self.state_path)), exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._queries, f)
+            replace(temp_path, self.state_path)
@@ -1,14 +1,13 @@
-from os import chdir, getcwd, makedirs, path
-from contextlib import contextmanager
-
-@contextmanager
-def change_dir(destination: str):
-    """Sets a destination for exported files."""
-    cwd = getcwd()
-    try:
-        __dest = path.realpath(destination)
-        makedirs(__dest, exist_ok=True)
-        chdir(__dest)
-        yield
-    finally:
-        chdir(cwd)
+from os import makedirs, path
+
+
+def export_path(*parts: str) -> str:
+    """Joins parts into an absolute path for an exported file.
+    Nothing changes the working directory, so this is safe to use from threads and worker processes.
+    """
+    return path.realpath(path.join(*parts))
+
+
+def make_export_dir(file_path: str) -> None:
+    """Creates the directory that file_path will be written to, if it doesn't exist yet."""
+    makedirs(path.dirname(file_path), exist_ok=True)
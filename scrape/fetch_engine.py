@@ -0,0 +1,576 @@
+import codecs
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from json import loads
+from json.decoder import JSONDecodeError
+from time import monotonic, sleep
+from typing import Any, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, HTTPError, RequestException, Timeout
+
+from scrape.configs import JobScrapeConfig
+from scrape.listing_body import ListingBody, spool_response
+from scrape.log import logger
+from scrape.metrics import metrics
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of requesting a host whose circuit breaker is open."""
+
+
+class HostRateLimiter:
+    """Spaces out the requests made to a single host so that no more than
+    `rate` of them start per second on average. Up to `burst` requests may
+    start at once after the host has been idle.
+
+    With additive_increase set, the rate adapts to what the host tolerates, AIMD-style:
+    every success raises it by additive_increase, up to max_rate, and every time the host
+    pushes back the rate is halved, down to min_rate (an eighth of the starting rate
+    unless given). A rate of 0 means no limit.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        additive_increase: float = 0.0,
+    ):
+        self.burst = burst
+        self.min_rate = min_rate if min_rate is not None else rate / 8
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.additive_increase = additive_increase
+        self._next_slot: float = 0.0
+        self._paused_until: float = 0.0
+        self._lock = threading.Lock()
+        self._set_rate(rate)
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = rate
+        self.interval: float = 1.0 / rate if rate > 0 else 0.0
+        self.burst_window: float = max(self.burst - 1, 0) * self.interval
+
+    def reserve(self) -> float:
+        """reserve claims the next free slot for this host.
+
+        Returns:
+            float: how many seconds the caller has to wait before its slot opens.
+        """
+        with self._lock:
+            now = monotonic()
+            theoretical = max(now, self._next_slot)
+            slot = max(now, theoretical - self.burst_window)
+            # a pause is not something a burst may borrow against
+            slot = max(slot, self._paused_until)
+            self._next_slot = theoretical + self.interval
+            return slot - now
+
+    def increase(self) -> None:
+        """increase speeds the host up a little, after a request it handled well."""
+        with self._lock:
+            if self.rate > 0 and self.additive_increase > 0:
+                self._set_rate(min(self.max_rate, self.rate + self.additive_increase))
+
+    def decrease(self, pause: Optional[float] = None) -> None:
+        """decrease halves the host's rate after it pushed back, and with pause,
+        e.g. from a Retry-After header, holds every request to it for that many seconds.
+        """
+        with self._lock:
+            if self.rate > 0:
+                self._set_rate(max(self.min_rate, self.rate / 2))
+            if pause:
+                self._paused_until = max(self._paused_until, monotonic() + pause)
+
+
+class CircuitBreaker:
+    """Stops sending requests to a host that keeps failing.
+
+    After `failures` failures in a row the circuit opens, and requests to the host fail
+    straight away. Once `cooldown` seconds have passed, one trial request is let through:
+    if it succeeds the circuit closes again, and if it fails, or ends any other way, the
+    circuit stays open for another cooldown. failures=0 turns the breaker off.
+    """
+
+    def __init__(self, failures: int = 5, cooldown: float = 60.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._trial and monotonic() - self._opened_at >= self.cooldown:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def end_trial(self) -> None:
+        """end_trial settles a trial request that neither succeeded nor failed, e.g. one that
+        was throttled or raised an unexpected error: the circuit stays open for another cooldown.
+        """
+        with self._lock:
+            if self._trial:
+                self._opened_at = monotonic()
+                self._trial = False
+
+    def record_failure(self) -> bool:
+        """record_failure counts one failure.
+
+        Returns:
+            bool: whether this failure opened the circuit.
+        """
+        with self._lock:
+            self._consecutive += 1
+            if self.failures > 0 and (self._trial or self._consecutive >= self.failures):
+                opened = self._opened_at is None
+                self._opened_at = monotonic()
+                self._trial = False
+                return opened
+            return False
+
+
+class RetryBudget:
+    """Caps retries at `ratio` of all requests made, plus `minimum` to get started,
+    so that when a whole host is failing, retries cannot multiply the load on it.
+    """
+
+    def __init__(self, ratio: float = 0.2, minimum: int = 10):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def spend(self) -> bool:
+        """spend takes one retry from the budget, if there is one left."""
+        with self._lock:
+            if self.retries < self.minimum + self.ratio * self.requests:
+                self.retries += 1
+                return True
+            return False
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """backoff_delay is how long to wait before retry number attempt + 1:
+    exponential in attempt, capped, with full jitter so that retries don't arrive in waves.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def retry_after_seconds(response: Response) -> Optional[float]:
+    """retry_after_seconds reads a Retry-After header, given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ConditionalFetch:
+    """The outcome of FetchEngine.fetch_conditional."""
+
+    docs: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+class FetchEngine:
+    """FetchEngine keeps one pooled requests.Session, one adaptive HostRateLimiter and one
+    CircuitBreaker per host. It is thread-safe, and each session pools up to max_concurrency
+    connections, so the pipeline's stages can have many requests in flight at once.
+
+    Throttled (429) and failed (5xx, connection error, timeout) requests are retried with
+    jittered exponential backoff, or after the host's Retry-After (at most backoff_cap),
+    up to max_retries times and within an engine-wide RetryBudget.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 0.5,
+        burst_per_host: int = 1,
+        max_concurrency: int = 8,
+        timeout: float = 30.0,
+        max_requests_per_second: Optional[float] = None,
+        min_requests_per_second: Optional[float] = None,
+        rate_increase: float = 0.0,
+        max_retries: int = 3,
+        retry_budget_ratio: float = 0.2,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        circuit_failures: int = 5,
+        circuit_cooldown: float = 60.0,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst_per_host = burst_per_host
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_requests_per_second = max_requests_per_second
+        self.min_requests_per_second = min_requests_per_second
+        self.rate_increase = rate_increase
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.circuit_failures = circuit_failures
+        self.circuit_cooldown = circuit_cooldown
+        self.retry_budget = RetryBudget(ratio=retry_budget_ratio)
+        self._sessions: dict[str, Session] = {}
+        self._limiters: dict[str, HostRateLimiter] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _host_state(
+        self, target_url: str
+    ) -> tuple[Session, HostRateLimiter, CircuitBreaker]:
+        host = urlsplit(target_url).netloc
+        with self._lock:
+            if host not in self._sessions:
+                session = Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.max_concurrency
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._limiters[host] = HostRateLimiter(
+                    self.requests_per_second,
+                    self.burst_per_host,
+                    min_rate=self.min_requests_per_second,
+                    max_rate=self.max_requests_per_second,
+                    additive_increase=self.rate_increase,
+                )
+                self._breakers[host] = CircuitBreaker(
+                    self.circuit_failures, self.circuit_cooldown
+                )
+            return self._sessions[host], self._limiters[host], self._breakers[host]
+
+    def get(
+        self,
+        target_url: str,
+        params: Optional[dict] = None,
+        stream: bool = False,
+        headers: Optional[dict] = None,
+    ) -> Response:
+        """get waits for the host's next rate-limit slot, then requests target_url
+        over that host's pooled session, retrying throttled and failed requests.
+
+        Raises:
+            CircuitOpenError: the host has been failing, so it is not being asked for now.
+            RequestException: the request failed, and could not be retried again.
+
+        Returns:
+            Response: the response, which may still be an error once the retries run out.
+        """
+        host = urlsplit(target_url).netloc
+        session, limiter, breaker = self._host_state(target_url)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                metrics.inc("http", "short_circuited")
+                raise CircuitOpenError(f"{host} keeps failing, not requesting {target_url} for now")
+            delay = limiter.reserve()
+            if delay > 0:
+                sleep(delay)
+            self.retry_budget.record_request()
+            metrics.inc("http", "requests")
+            try:
+                response = session.get(
+                    target_url,
+                    params=params,
+                    timeout=self.timeout,
+                    stream=stream,
+                    headers=headers,
+                )
+            except (ConnectionError, Timeout) as error_found:
+                metrics.inc("http", "errors")
+                self._failed(host, breaker, limiter)
+                if not self._may_retry(attempt):
+                    raise
+                wait = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                cause = repr(error_found)
+            except BaseException:
+                breaker.end_trial()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    limiter.increase()
+                    if metrics.enabled and not stream:
+                        metrics.inc("http", "bytes", len(response.content))
+                    if not response.ok:
+                        metrics.inc("http", "errors")
+                    return response
+
+                metrics.inc("http", "errors")
+                retry_after = retry_after_seconds(response)
+                if retry_after is not None and retry_after > self.backoff_cap:
+                    # never park a fetch thread, or the whole host, for longer than a backoff
+                    logger.info(
+                        f"{host} asked to wait {retry_after:.0f}s; waiting {self.backoff_cap:.0f}s instead."
+                    )
+                    retry_after = self.backoff_cap
+                if response.status_code == 429:
+                    metrics.inc("http", "throttled")
+                    breaker.end_trial()
+                    limiter.decrease(pause=retry_after)
+                else:
+                    self._failed(host, breaker, limiter, pause=retry_after)
+                if not self._may_retry(attempt):
+                    return response
+                response.close()
+                wait = (
+                    retry_after
+                    if retry_after is not None
+                    else backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                )
+                cause = f"HTTP {response.status_code}"
+            attempt += 1
+            metrics.inc("http", "retries")
+            logger.info(f"Retrying {target_url} in {wait:.1f}s after {cause} (retry {attempt} of {self.max_retries})")
+            sleep(wait)
+
+    def _may_retry(self, attempt: int) -> bool:
+        return attempt < self.max_retries and self.retry_budget.spend()
+
+    def _failed(
+        self,
+        host: str,
+        breaker: CircuitBreaker,
+        limiter: HostRateLimiter,
+        pause: Optional[float] = None,
+    ) -> None:
+        limiter.decrease(pause=pause)
+        if breaker.record_failure():
+            metrics.inc("http", "circuit_opened")
+            logger.warning(
+                f"{host} has failed {breaker.failures} times in a row; pausing requests to it for {breaker.cooldown:.0f}s."
+            )
+
+    def fetch(
+        self,
+        target_url: str,
+        run_beautiful_soup: bool = False,
+        querystring: Optional[dict] = None,
+    ) -> Any:
+        """fetch requests target_url and decodes the response.
+
+        Args:
+            - target_url (str): a website to be scraped
+            - run_beautiful_soup (bool, optional): parse the response as HTML with BeautifulSoup
+                instead of as JSON. Defaults to False.
+            - querystring (Optional[dict], optional): A querystring to govern the requested results. Defaults to None.
+
+        Returns:
+            Any: Is either text from JSON, text from BeautifulSoup, or None if no results were found.
+        """
+        try:
+            r = self.get(target_url, params=querystring)
+            if r.ok:
+                if not run_beautiful_soup:
+                    return loads(r.text)
+                from bs4 import BeautifulSoup
+
+                return BeautifulSoup(r.text, "html.parser")
+            logger.warning(f"{target_url} answered {r.status_code}, moving to next item in sequence.")
+        except (
+            JSONDecodeError,
+            RequestException,
+            HTTPError,
+            AttributeError,
+        ) as exception:
+            logger.warning(
+                f"[jobscraper] An error has occurred, moving to next item in sequence.\
+                Cause of error: {exception}"
+            )
+
+    def fetch_conditional(
+        self,
+        target_url: str,
+        querystring: Optional[dict] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> "ConditionalFetch":
+        """fetch_conditional requests target_url as JSON with If-None-Match and If-Modified-Since,
+        when there are validators from an earlier fetch, so an unchanged resource costs a 304 and no body.
+
+        Returns:
+            ConditionalFetch: the decoded JSON, or None if it was unchanged or the request failed,
+            and the validators to send next time.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            r = self.get(target_url, params=querystring, headers=headers or None)
+            if r.status_code == 304:
+                metrics.inc("http", "not_modified")
+                return ConditionalFetch(None, etag, last_modified, not_modified=True)
+            if r.ok:
+                return ConditionalFetch(
+                    loads(r.text), r.headers.get("ETag"), r.headers.get("Last-Modified")
+                )
+            logger.warning(f"{target_url} answered {r.status_code}, moving to next item in sequence.")
+        except (JSONDecodeError, RequestException) as exception:
+            logger.warning(
+                f"[jobscraper] An error has occurred, moving to next item in sequence.\
+                Cause of error: {exception}"
+            )
+        return ConditionalFetch(None, etag, last_modified)
+
+    def fetch_spooled(
+        self, target_url: str, querystring: Optional[dict] = None
+    ) -> Optional[ListingBody]:
+        """fetch_spooled requests target_url and spools its JSON body to a temporary file,
+        chunk by chunk, for ListingBody to decode a record at a time.
+
+        Returns:
+            Optional[ListingBody]: the spooled body, or None if the request failed.
+        """
+        try:
+            with self.get(target_url, params=querystring, stream=True) as r:
+                if not r.ok:
+                    logger.warning(
+                        f"{target_url} answered {r.status_code}, moving to next item in sequence."
+                    )
+                    return None
+                received = 0
+
+                def counted(chunks: Iterable[bytes]) -> Iterator[bytes]:
+                    nonlocal received
+                    for chunk in chunks:
+                        received += len(chunk)
+                        yield chunk
+
+                try:
+                    return spool_response(counted(r.iter_content(chunk_size=65_536)))
+                finally:
+                    metrics.inc("http", "bytes", received)
+        except RequestException as exception:
+            logger.warning(
+                f"[jobscraper] An error has occurred, moving to next item in sequence.\
+                Cause of error: {exception}"
+            )
+            return None
+
+    def stream(
+        self, target_url: str, max_bytes: int = 512_000, chunk_size: int = 16_384
+    ) -> Iterator[str]:
+        """stream requests target_url and yields its body as text, a chunk at a time,
+        without holding the whole page in memory.
+
+        Reading stops after max_bytes, and the connection goes back to the pool as soon
+        as the caller stops iterating, so a caller that finds what it needs early never
+        downloads the rest of the page.
+
+        Args:
+            - target_url (str): a website to be scraped
+            - max_bytes (int, optional): the most of the body to read. Defaults to 512_000.
+            - chunk_size (int, optional): how many bytes to read at a time. Defaults to 16_384.
+
+        Yields:
+            Iterator[str]: the decoded body, chunk by chunk. Nothing if the request was not ok.
+        """
+        received = 0
+        with self.get(target_url, stream=True) as response:
+            try:
+                if not response.ok:
+                    logger.warning(f"{target_url} answered {response.status_code}, skipping it.")
+                    return
+                try:
+                    decoder_class = codecs.getincrementaldecoder(response.encoding or "utf-8")
+                except LookupError:
+                    logger.debug(
+                        f"{target_url} has unknown charset {response.encoding!r}, reading it as utf-8."
+                    )
+                    decoder_class = codecs.getincrementaldecoder("utf-8")
+                decoder = decoder_class(errors="replace")
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    chunk = chunk[: max_bytes - received]
+                    received += len(chunk)
+                    yield decoder.decode(chunk)
+                    if received >= max_bytes:
+                        metrics.inc("http", "truncated")
+                        break
+                yield decoder.decode(b"", final=True)
+            finally:
+                metrics.inc("http", "bytes", received)
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._limiters.clear()
+
+
+_engine: Optional[FetchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> FetchEngine:
+    """Returns the process-wide FetchEngine, creating one with default settings if needed."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+        return _engine
+
+
+def configure_engine(config: JobScrapeConfig) -> FetchEngine:
+    """Replaces the process-wide FetchEngine with one built from the config's rate limits and concurrency."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+        _engine = FetchEngine(
+            requests_per_second=config.requests_per_second,
+            burst_per_host=config.burst_per_host,
+            max_concurrency=config.max_concurrency,
+            max_requests_per_second=config.max_requests_per_second,
+            min_requests_per_second=config.min_requests_per_second,
+            rate_increase=config.rate_increase,
+            max_retries=config.max_retries,
+            retry_budget_ratio=config.retry_budget_ratio,
+            backoff_base=config.backoff_base,
+            backoff_cap=config.backoff_cap,
+            circuit_failures=config.circuit_failures,
+            circuit_cooldown=config.circuit_cooldown,
+        )
+        return _engine
@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import threading
+from dataclasses import asdict
+from os import makedirs, path
+from time import time
+from typing import Optional
+
+from scrape.company_result import CompanyResult, intern_strings
+from scrape.journal import job_key
+from scrape.log import logger
+from scrape.striptags import strip_tags
+
+
+class JobIndex:
+    """A local SQLite FTS5 index of every job scraped, so jobs can be searched and
+    written to again without going back to BuiltIn.
+
+    Each CompanyResult is stored whole, and its company name, job title, stripped job
+    description, industries, adjectives and city are indexed for full-text search.
+    Jobs are keyed like the checkpoint journal keys them, so scraping a job again
+    replaces its entry instead of adding a second one.
+    """
+
+    SEARCH_FIELDS = ("company_name", "job_name", "description", "industries", "adjectives", "city")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        makedirs(path.dirname(path.realpath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                payload TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                {", ".join(self.SEARCH_FIELDS)},
+                tokenize = 'porter unicode61'
+            )"""
+        )
+        self._conn.commit()
+
+    def add(self, company: CompanyResult) -> None:
+        """add indexes one job, replacing whatever the index held for it before."""
+        key = job_key(company.alias, company.job_id, company.job_name)
+        payload = json.dumps(asdict(company))
+        searchable = (
+            company.company_name or "",
+            company.job_name or "",
+            strip_tags(company.job_description or ""),
+            " ".join(company.industries),
+            " ".join(company.adjectives),
+            company.city or "",
+        )
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                cursor = self._conn.execute(
+                    "INSERT INTO jobs (key, payload, indexed_at) VALUES (?, ?, ?)",
+                    (key, payload, time()),
+                )
+                job_id = cursor.lastrowid
+            else:
+                (job_id,) = row
+                self._conn.execute(
+                    "UPDATE jobs SET payload = ?, indexed_at = ? WHERE id = ?",
+                    (payload, time(), job_id),
+                )
+                self._conn.execute("DELETE FROM jobs_fts WHERE rowid = ?", (job_id,))
+            self._conn.execute(
+                f"INSERT INTO jobs_fts (rowid, {', '.join(self.SEARCH_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, *searchable),
+            )
+            self._conn.commit()
+
+    def search(self, query: str, limit: Optional[int] = None) -> list[CompanyResult]:
+        """search finds the jobs matching an FTS5 query, best matches first.
+
+        Args:
+            query (str): an FTS5 query: keywords such as 'design lead', phrases such as '"user research"',
+                boolean operators, or field queries such as 'job_name:director AND industries:fintech'.
+                The fields are company_name, job_name, description, industries, adjectives and city.
+            limit (Optional[int], optional): the most jobs to return. Defaults to None, for all of them.
+
+        Returns:
+            list[CompanyResult]: the matching jobs, ranked by bm25.
+
+        Raises:
+            ValueError: if query is not a valid FTS5 query.
+        """
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    """SELECT jobs.payload FROM jobs_fts
+                    JOIN jobs ON jobs.id = jobs_fts.rowid
+                    WHERE jobs_fts MATCH ?
+                    ORDER BY bm25(jobs_fts)
+                    LIMIT ?""",
+                    (query, -1 if limit is None else limit),
+                ).fetchall()
+            except sqlite3.OperationalError as error_found:
+                raise ValueError(
+                    f"{query!r} is not a valid search query: {error_found}"
+                ) from error_found
+        return [_company_result(json.loads(payload)) for (payload,) in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        logger.debug(f"Job index closed: {self.db_path}")
+
+
+def _company_result(payload: dict) -> CompanyResult:
+    payload["industries"] = intern_strings(payload.get("industries"))
+    payload["adjectives"] = intern_strings(payload.get("adjectives"))
+    return CompanyResult(**payload)
@@ -0,0 +1,85 @@
+import json
+import threading
+from os import SEEK_END, makedirs, path
+from time import time
+from typing import Any, Optional
+
+from scrape.log import logger
+
+
+def job_key(alias: str, job_id: str, job_name: str) -> str:
+    """The identity of one job in the journal: its company alias plus its BuiltIn id, or its title if it has none."""
+    return f"job:{alias}/{job_id or job_name}"
+
+
+def company_key(alias: str) -> str:
+    """The identity of one company in the journal."""
+    return f"company:{alias}"
+
+
+class CheckpointJournal:
+    """An append-only JSON-lines journal of the pipeline stages completed for each job and company.
+
+    Every completed stage is written and flushed as one line, so a crash loses at most the
+    line being written. Opened with resume=True, the journal is read back first, so a
+    rerun can skip whatever the previous run already finished; otherwise it starts empty.
+    """
+
+    def __init__(self, journal_path: str, resume: bool = False):
+        self.journal_path = journal_path
+        self._completed: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if resume and path.exists(journal_path):
+            self._load()
+        makedirs(path.dirname(path.realpath(journal_path)), exist_ok=True)
+        self._file = open(journal_path, "a" if resume else "w", encoding="utf-8")
+        if resume and not self._ends_with_newline():
+            # a crash mid-write left a torn last line; end it, so the next record
+            # starts on a line of its own instead of being glued onto the fragment
+            self._file.write("\n")
+            self._file.flush()
+
+    def _load(self) -> None:
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"Ignoring unreadable line {line_number} of {self.journal_path}"
+                    )
+                    continue
+                self._completed.setdefault(entry["key"], {})[entry["stage"]] = entry.get(
+                    "payload"
+                )
+        logger.info(
+            f"Resuming from {self.journal_path}: {len(self._completed)} jobs and companies already started."
+        )
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_path, "rb") as f:
+            if f.seek(0, SEEK_END) == 0:
+                return True
+            f.seek(-1, SEEK_END)
+            return f.read(1) == b"\n"
+
+    def record(self, key: str, stage: str, payload: Optional[Any] = None) -> None:
+        """record appends one completed stage for key, with whatever payload a rerun needs to skip it."""
+        line = json.dumps({"key": key, "stage": stage, "payload": payload, "at": time()})
+        with self._lock:
+            self._completed.setdefault(key, {})[stage] = payload
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def completed(self, key: str, stage: str) -> bool:
+        with self._lock:
+            return stage in self._completed.get(key, {})
+
+    def payload(self, key: str, stage: str) -> Optional[Any]:
+        with self._lock:
+            return self._completed.get(key, {}).get(stage)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
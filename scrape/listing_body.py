@@ -0,0 +1,55 @@
+import json
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Iterator, Optional
+
+
+class ListingBody:
+    """One listing page's JSON, spooled to a temporary file as it downloads rather than
+    decoded into one big document.
+
+    The page holds two parallel arrays, "jobs" and "companies". companies() reads the
+    small company records in one pass; jobs() then streams the job records, with their
+    large HTML bodies, one at a time in a second pass. With ijson installed, only one job
+    is decoded at a time; without it, the spooled body is decoded whole, once, and both
+    passes read that document.
+    """
+
+    def __init__(self, spool: IO[bytes]):
+        self._spool = spool
+        self._document: Optional[dict] = None
+
+    def _items(self, prefix: str) -> Iterator[Any]:
+        """Yields the records under prefix, e.g. "jobs.item". Malformed JSON raises ValueError either way."""
+        try:
+            import ijson
+        except ImportError:
+            if self._document is None:
+                self._spool.seek(0)
+                self._document = json.load(self._spool)
+            yield from self._document.get(prefix.split(".")[0]) or []
+            return
+        self._spool.seek(0)
+        try:
+            yield from ijson.items(self._spool, prefix, use_float=True)
+        except ijson.JSONError as error_found:
+            raise ValueError(f"Malformed listing JSON: {error_found}") from error_found
+
+    def companies(self) -> list[dict]:
+        """companies returns every company record on the page, in order."""
+        return list(self._items("companies.item"))
+
+    def jobs(self) -> Iterator[dict]:
+        """jobs yields the job records on the page one at a time, in order."""
+        return self._items("jobs.item")
+
+    def close(self) -> None:
+        self._document = None
+        self._spool.close()
+
+
+def spool_response(chunks: Iterator[bytes], max_memory: int = 1 << 20) -> ListingBody:
+    """spool_response writes a response body to a temporary file, kept in memory up to max_memory bytes."""
+    spool = SpooledTemporaryFile(max_size=max_memory)
+    for chunk in chunks:
+        spool.write(chunk)
+    return ListingBody(spool)
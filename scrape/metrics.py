@@ -0,0 +1,138 @@
+import json
+import threading
+from contextlib import contextmanager, nullcontext
+from math import inf
+from os import makedirs, path
+from time import perf_counter
+from typing import ContextManager, Iterator
+
+BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, inf)
+_DISABLED = nullcontext()
+
+
+class Histogram:
+    """A cumulative latency histogram over BUCKETS, in seconds, as Prometheus expects."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.total += seconds
+        self.count += 1
+        for idx, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[idx] += 1
+                break
+
+    def cumulative(self) -> list[int]:
+        running, cumulative = 0, []
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+class Metrics:
+    """Per-stage latency histograms and event counters (requests, bytes, retries, cache hits...).
+
+    Off by default: until enable() is called, timer() hands back a shared no-op context
+    and every other call returns straight away, so the instrumentation costs next to nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def timer(self, stage: str) -> ContextManager:
+        """timer times the enclosed block and records it as one observation of stage."""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(stage)
+
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, perf_counter() - start)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._histograms.setdefault(stage, Histogram()).observe(seconds)
+
+    def inc(self, stage: str, event: str, amount: float = 1) -> None:
+        """inc adds amount to the counter for event within stage, e.g. inc("http", "bytes", 5120)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(stage, event)] = self._counters.get((stage, event), 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {
+                        "count": histogram.count,
+                        "total_seconds": histogram.total,
+                        "mean_seconds": histogram.total / histogram.count if histogram.count else 0.0,
+                        "buckets": {
+                            ("+Inf" if bound == inf else str(bound)): count
+                            for bound, count in zip(BUCKETS, histogram.cumulative())
+                        },
+                    }
+                    for stage, histogram in sorted(self._histograms.items())
+                },
+                "counters": {
+                    f"{stage}.{event}": value
+                    for (stage, event), value in sorted(self._counters.items())
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """to_prometheus renders the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP jobscraper_stage_seconds Time spent per item in each jobscraper stage.",
+            "# TYPE jobscraper_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(BUCKETS, histogram.cumulative()):
+                    le = "+Inf" if bound == inf else str(bound)
+                    lines.append(f'jobscraper_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'jobscraper_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'jobscraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines += [
+                "# HELP jobscraper_events_total Requests, bytes, retries and cache hits per stage.",
+                "# TYPE jobscraper_events_total counter",
+            ]
+            for (stage, event), value in sorted(self._counters.items()):
+                lines.append(f'jobscraper_events_total{{stage="{stage}",event="{event}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, directory: str) -> list[str]:
+        """dump writes metrics.json and metrics.prom to directory.
+
+        Returns:
+            list[str]: the paths written.
+        """
+        makedirs(directory, exist_ok=True)
+        json_path = path.join(directory, "metrics.json")
+        prom_path = path.join(directory, "metrics.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return [json_path, prom_path]
+
+
+metrics = Metrics()
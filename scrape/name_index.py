@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+_END = ""
+_SEPARATORS = "-_.0123456789"
+
+
+@dataclass(frozen=True)
+class NameSplit:
+    """One division of a username into a first and last name, lowercased.
+    first_known tells whether the first name is a known first name, rather than
+    whatever came before a known surname.
+    """
+
+    first: str
+    last: str
+    first_known: bool = True
+
+
+class FirstNameIndex:
+    """A character trie over lowercased first names, used to find every
+    first name that a username starts with in a single walk of the username.
+    Surnames, when given, are used to score where the first name ends and the
+    last name begins.
+    """
+
+    def __init__(self, first_names: Iterable[str], surnames: Iterable[str] = ()):
+        self._root: dict = {}
+        names = set()
+        for name in first_names:
+            name = name.strip()
+            if not name:
+                continue
+            names.add(name)
+            node = self._root
+            for char in name.lower():
+                node = node.setdefault(char, {})
+            node[_END] = True
+        self.names: frozenset[str] = frozenset(names)
+        self.surnames: frozenset[str] = frozenset(
+            surname.strip().lower() for surname in surnames if surname.strip()
+        )
+
+    def prefixes(self, username: str) -> list[str]:
+        """prefixes finds every first name that username starts with.
+
+        Args:
+            username (str): the username to be assessed, e.g. "janedoe".
+
+        Returns:
+            list[str]: the matching prefixes of username, shortest first, e.g. ["jan", "jane"].
+        """
+        username = username.lower()
+        found = []
+        node = self._root
+        for idx, char in enumerate(username):
+            node = node.get(char)
+            if node is None:
+                break
+            if _END in node:
+                found.append(username[: idx + 1])
+        return found
+
+    def split(self, username: str) -> Optional[NameSplit]:
+        """split picks the most likely (first, last) division of username.
+
+        A first-name prefix whose remainder is a known surname beats any other split.
+        Otherwise the longest first-name prefix wins, and if there are none, a known
+        surname at the end of the username marks the split.
+
+        Args:
+            username (str): the username to be assessed.
+
+        Returns:
+            Optional[NameSplit]: the lowercased first and last name, or None if no split was found.
+        """
+        username = username.lower().strip()
+        best: Optional[NameSplit] = None
+        best_score = 0
+        for first in self.prefixes(username):
+            last = username[len(first) :].strip(_SEPARATORS)
+            score = len(first)
+            if last in self.surnames:
+                score += len(username)
+            if score > best_score:
+                best, best_score = NameSplit(first, last), score
+        if best is not None:
+            return best
+
+        for idx in range(1, len(username)):
+            last = username[idx:].strip(_SEPARATORS)
+            if last in self.surnames:
+                return NameSplit(username[:idx].strip(_SEPARATORS), last, first_known=False)
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_first_name_index(surnames_path: Optional[str] = None) -> FirstNameIndex:
+    """Builds the FirstNameIndex over the NLTK names corpus once per process,
+    along with the surnames listed one per line in surnames_path.
+    """
+    from nltk.corpus import names
+
+    surnames: list[str] = []
+    if surnames_path:
+        with open(surnames_path, "r", encoding="utf8") as f:
+            surnames = f.readlines()
+    return FirstNameIndex(names.words(), surnames)
@@ -1,21 +1,39 @@
 import re
-from contextlib import suppress
 from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Optional
 
-from bs4 import BeautifulSoup
-from googlesearch import search
-from nltk.corpus import names, webtext
 from requests.exceptions import HTTPError, ProxyError, RequestException, Timeout
-from textblob import TextBlob
-from tld import get_tld
 
+from scrape.brand_matcher import get_brand_matcher
 from scrape.company_result import CompanyResult
 from scrape.configs import JobScrapeConfig
 from scrape.log import logger
-from scrape.web_scraper import webscrape_results
-
-FIRST_NAMES: set[str] = names.words()
-WEBTEXT: set[str] = webtext.words()
+from scrape.metrics import metrics
+from scrape.name_index import get_first_name_index
+from scrape.token_filter import get_webtext_filter
+from scrape.striptags import iter_words
+from scrape.web_scraper import stream_page_text
+
+SearchFunc = Callable[[str], Iterable[str]]
+
+# How sure each way of finding a contact's name is, from 0.0 (no name at all) to 1.0.
+# ContactCache only reuses contacts at or above config.contact_min_confidence.
+# A LinkedIn username such as jane-doe, or jane-q-doe-123
+LINKEDIN_NAME_CONFIDENCE = 0.9
+LINKEDIN_LONG_NAME_CONFIDENCE = 0.8
+# A username such as janedoe split by the first name index, with or without a known surname
+KNOWN_SURNAME_CONFIDENCE = 0.8
+UNKNOWN_SURNAME_CONFIDENCE = 0.5
+FIRST_NAME_ONLY_CONFIDENCE = 0.3
+# A username such as xqsmith, where only the surname is known and the rest is a guess
+SURNAME_ONLY_CONFIDENCE = 0.2
+# A username cut down the middle, with no first name recognised in it
+MIDDLE_SPLIT_CONFIDENCE = 0.1
+# A first name followed by a word on the page: a known surname, any other word, or a brand
+PAGE_SOURCE_SURNAME_CONFIDENCE = 0.75
+PAGE_SOURCE_GUESS_CONFIDENCE = 0.6
+PAGE_SOURCE_BRAND_CONFIDENCE = 0.4
 
 
 @dataclass(order=True)
@@ -27,6 +45,7 @@ class BusinessCard:
     surname: str
     fullname: str
     workplace: str
+    confidence: float = 0.0
 
 
 class NetworkingAssistant:
@@ -36,25 +55,28 @@ class NetworkingAssistant:
         self,
         company: CompanyResult,
         config: JobScrapeConfig,
+        search: Optional[SearchFunc] = None,
     ):
         self.company = company
         self.config = config
+        self.search: SearchFunc = search or google_search
         self.search_query = self.config.search_query
         self.linkedin_uri = "linkedin.com"
         self.wiza_uri = "https://wiza.co/d/"
         self.twitter_uri = "https://twitter.com/"
         self.facebook_uri = "facebook.com/"
 
-        with open(config.brand_names, "r", encoding="utf8") as f:
-            brand_names = set(f.readlines())
-            self.set_of_brandnames: set[str] = {
-                brand.strip("\n") for brand in brand_names
-            }
+        self.brand_matcher = get_brand_matcher(config.brand_names)
+        self.set_of_brandnames: frozenset[str] = self.brand_matcher.brands
 
-        self.set_of_firstnames = FIRST_NAMES
+        self.first_name_index = get_first_name_index(config.surnames)
+        self.set_of_firstnames = self.first_name_index.names
         self.greeting: str = "To"
         self.first: str = "Whom It"
         self.last: str = "May Concern"
+        # how sure we are that the name is right, from 0.0 (no name at all) to 1.0
+        self.confidence: float = 0.0
+        self.candidate_links: list[str] = []
 
     def gratuitous_schmoozing(self) -> BusinessCard:
         """gratuitous_schmoozing searches for contact information based on urls and source page data.
@@ -64,8 +86,10 @@ class NetworkingAssistant:
         """
 
         search_results = self.seeking_networking_info()
+        self.candidate_links = search_results
         for link in search_results:
             logger.info(f"\nGetting: {link} | {self.company.company_name}\n")
+            brand_matches = self.brand_matcher.find_all(link)
 
             if self.linkedin_uri in link:
                 (
@@ -83,30 +107,13 @@ class NetworkingAssistant:
             elif self.facebook_uri in link:
                 logger.error(f"Skipping: {link} as it is a Facebook url")
 
-            elif len([brand for brand in self.set_of_brandnames if brand in link]) != 0:
-                logger.debug("brand matches found")
-                try:
-                    response = webscrape_results(link, id=2)
-                    (
-                        self.greeting,
-                        self.first,
-                        self.last,
-                    ) = self.fetch_names_from_page_sources(response)
-                except (
-                    TypeError,
-                    HTTPError,
-                    ConnectionError,
-                    ProxyError,
-                    Timeout,
-                    IndexError,
-                    ValueError,
-                    RequestException,
-                ) as error_found:
-                    logger.error(error_found)
-
-            elif len([brand for brand in self.set_of_brandnames if brand in link]) == 0:
+            elif brand_matches:
+                logger.debug(f"brand matches found: {brand_matches}")
+                self.read_page_source(link)
+
+            elif not brand_matches:
                 logger.debug("no brand matches found")
-                username = get_tld(link, fail_silently=True, as_object=True).domain
+                username = _get_tld(link).domain
                 (
                     self.greeting,
                     self.first,
@@ -114,93 +121,132 @@ class NetworkingAssistant:
                 ) = self.compare_username_against_firstnames_set(username)
 
             else:
-                try:
-                    response = webscrape_results(link, id=2)
-                    (
-                        self.greeting,
-                        self.first,
-                        self.last,
-                    ) = self.fetch_names_from_page_sources(response)
-                except (
-                    TypeError,
-                    HTTPError,
-                    ConnectionError,
-                    ProxyError,
-                    Timeout,
-                    IndexError,
-                    ValueError,
-                    RequestException,
-                ) as error_found:
-                    logger.error(error_found)
-
-            contact_card = BusinessCard(
-                greeting=self.greeting,
-                fname=self.first,
-                surname=self.last,
-                fullname=f"{self.first} {self.last}",
-                workplace=self.company.company_name,
-            )
-            return contact_card
+                self.read_page_source(link)
+
+            return self.business_card()
+
+        # no search results at all: address the letter "To Whom It May Concern"
+        return self.business_card()
+
+    def business_card(self) -> BusinessCard:
+        """business_card packs the contact found so far into a BusinessCard."""
+        return BusinessCard(
+            greeting=self.greeting,
+            fname=self.first,
+            surname=self.last,
+            fullname=f"{self.first} {self.last}",
+            workplace=self.company.company_name,
+            confidence=self.confidence,
+        )
 
     def seeking_networking_info(self):
-        """seeking_networking_info searches google for urls matching its provided search query.
+        """seeking_networking_info searches for urls matching its provided search query,
+        with google unless the assistant was given another search function.
 
         Returns:
-            A Generator that yields URL paths to be assessed or requested.
+            list[str]: URL paths to be assessed or requested.
         """
-        search_results = search(
-            query=f'"{self.company.company_name}" \
-                            {self.search_query}',
-            start=0,
-            stop=3,
-            pause=4,
-            country="US",
-            verify_ssl=False,
-        )
-        return search_results
+        with metrics.timer("search"):
+            return list(
+                self.search(
+                    contact_search_query(self.company.company_name, self.search_query)
+                )
+            )
+
+    def read_page_source(self, link: str) -> None:
+        """read_page_source streams the page at link and looks through its words for a name,
+        reading no more of the page than it takes to find one, up to page_source_max_bytes.
+
+        Args:
+            link (str): the page to be read.
+        """
+        # the page downloads while its words are read, so time spent waiting on the
+        # stream counts as page_source_fetch and the rest as name_extraction
+        fetch_seconds = [0.0]
+        start = perf_counter()
+        try:
+            words = iter_words(
+                _timed_chunks(
+                    stream_page_text(link, max_bytes=self.config.page_source_max_bytes),
+                    fetch_seconds,
+                )
+            )
+            try:
+                (
+                    self.greeting,
+                    self.first,
+                    self.last,
+                ) = self.fetch_names_from_page_sources(words)
+            finally:
+                words.close()
+                metrics.observe("page_source_fetch", fetch_seconds[0])
+                metrics.observe("name_extraction", perf_counter() - start - fetch_seconds[0])
+        except (
+            TypeError,
+            HTTPError,
+            ConnectionError,
+            ProxyError,
+            Timeout,
+            IndexError,
+            ValueError,
+            RequestException,
+        ) as error_found:
+            logger.error(error_found)
 
     def fetch_names_from_page_sources(
-        self, soup: BeautifulSoup
+        self, words: Iterable[str]
     ) -> tuple[str, str, str]:
-        """fetch_names_from_page_sources takes a page source object from BeautifulSoup
-            and from it extracts a self.first and self.last name.
+        """fetch_names_from_page_sources reads the words of a page source in order
+            and from them extracts a self.first and self.last name: a known first name
+            followed by a capitalised word.
+
+            It stops at the first such pair whose last name is a known surname. Failing that,
+            once the words run out it settles for the pair with the longest first name,
+            preferring pairs whose last name is not a brand.
 
         Args:
-            soup (BeautifulSoup): a BeautifulSoup object that contains the page source info to be assessed.
+            words (Iterable[str]): the words of the page source, e.g. from iter_words.
 
         Returns:
-            tuple[str,str]: A tuple containing a self.first and self.last name.
+            tuple[str,str,str]: A tuple containing a greeting, a self.first and a self.last name.
         """
-
-        all_text = TextBlob(soup.text)
-        self.entire_body = [
-            str(word) for word in all_text.words if str(word).lower() not in WEBTEXT
-        ]
-        self.first_names = [
-            word
-            for word in self.entire_body
-            if word.title() in self.set_of_firstnames and len(word)
-        ]
-
-        try:
-            self.first = max(self.first_names, key=len)
-        except ValueError as error_found:
-            logger.error(error_found)
-            pass
-
-        with suppress(TypeError, IndexError):
-            full_names = next_grams(self.entire_body, self.first)
-            logger.info(full_names)
-            for name in full_names:
-                logger.info(name)
-                if name[1] in self.set_of_brandnames:
-                    logger.info(
-                        f"{name} is for a brand, or is otherwise invalid. We encourage further review. Proceeding to next name."
-                    )
-                elif isinstance(name[1], type(None)):
-                    logger.info(f"{name} is not a name.")
-                self.greeting, self.first, self.last = "Dear", name[0], name[1]
-                return self.greeting, self.first, self.last
+        webtext = get_webtext_filter()
+        surnames = self.first_name_index.surnames
+        best: Optional[tuple[str, str]] = None
+        best_score: tuple[bool, int] = (False, 0)
+        first: Optional[str] = None
+        for word in words:
+            if word in webtext:
+                continue
+            if first is not None:
+                parts = camel_case_split(word)
+                if parts:
+                    last = parts[0]
+                    if last.lower() in surnames and last not in self.set_of_brandnames:
+                        logger.info(f"{first} {last} found, reading no further.")
+                        self.confidence = PAGE_SOURCE_SURNAME_CONFIDENCE
+                        self.greeting, self.first, self.last = "Dear", first, last
+                        return self.greeting, self.first, self.last
+                    score = (last not in self.set_of_brandnames, len(first))
+                    if best is None or score > best_score:
+                        best, best_score = (first, last), score
+            first = word if word.title() in self.set_of_firstnames else None
+
+        if best is None:
+            logger.info(f"No names found for {self.company.company_name}.")
+            return self.greeting, self.first, self.last
+        first, last = best
+        if last in self.set_of_brandnames:
+            logger.info(
+                f"{best} is for a brand, or is otherwise invalid. We encourage further review."
+            )
+        self.confidence = (
+            PAGE_SOURCE_BRAND_CONFIDENCE
+            if last in self.set_of_brandnames
+            else PAGE_SOURCE_GUESS_CONFIDENCE
+        )
+        self.greeting, self.first, self.last = "Dear", first, last
+        return self.greeting, self.first, self.last
 
     def fetch_names_from_linkedin_urls(self, link: str) -> tuple[str, str, str]:
         """fetch_names_from_linkedin_urls takes a URL from LinkedIn and, assuming it is a vanity sting, extracts the name accordingly.
@@ -229,7 +275,7 @@ class NetworkingAssistant:
             username = username.strip()
 
         else:
-            username = get_tld(link, fail_silently=True, as_object=True).domain
+            username = _get_tld(link).domain
             username = str(username).strip()
             (
                 self.greeting,
@@ -250,6 +296,7 @@ class NetworkingAssistant:
             ) = self.compare_username_against_firstnames_set(username)
 
         elif counter == int(1):
+            self.confidence = LINKEDIN_NAME_CONFIDENCE
             self.first, self.last = username.split("-", maxsplit=1)
             self.greeting, self.first, self.last = (
                 "Dear",
@@ -258,6 +305,7 @@ class NetworkingAssistant:
             )
 
         elif counter >= int(2):
+            self.confidence = LINKEDIN_LONG_NAME_CONFIDENCE
             self.first, middle, self.last, *_ = username.split("-", maxsplit=counter)
             if re.findall(r"[0-9]+", self.last):
                 self.last = middle
@@ -273,31 +321,34 @@ class NetworkingAssistant:
         return self.greeting, self.first, self.last
 
     def compare_username_against_firstnames_set(self, username: str):
-        self.greeting = "Dear"
-        first_candidates = [
-            first_name.strip()
-            for first_name in self.set_of_firstnames
-            if first_name.lower() in username and username.find(first_name.lower()) == 0
-        ]
-
-        if (
-            len(first_candidates) == 1
-        ):  # if only one candidate match found, that's the only match so it gets returned
-            self.first = first_candidates[0].title()
-            self.last = str(username[len(self.first) + 1 :]).title()
-            return self.greeting, self.first, self.last
+        """compare_username_against_firstnames_set splits a username into a first and last name,
+        using the shared first name index and scoring the split against the known surnames.
 
-        elif (
-            len(first_candidates) >= 2
-        ):  # if multiple matches found, then go for the longest one as that's likely to be the whole name
-            logger.info(first_candidates)
-            self.first = max(first_candidates, key=len).title()
-            logger.info(self.first)
-            self.last = str(username[len(self.first) :]).title()
-            logger.info(self.last)
+        Args:
+            username (str): A username or domain, e.g. "janedoe".
+
+        Returns:
+            tuple[str,str,str]: A tuple containing a self.greeting, self.first, and self.last name.
+        """
+        self.greeting = "Dear"
+        split = self.first_name_index.split(username)
+
+        if split is not None:
+            first, last = split.first, split.last
+            logger.info(f"{username} split into {first} {last}")
+            if not split.first_known:
+                self.confidence = SURNAME_ONLY_CONFIDENCE
+            elif last in self.first_name_index.surnames:
+                self.confidence = KNOWN_SURNAME_CONFIDENCE
+            else:
+                self.confidence = (
+                    UNKNOWN_SURNAME_CONFIDENCE if last else FIRST_NAME_ONLY_CONFIDENCE
+                )
+            self.first, self.last = first.title(), last.title()
             return self.greeting, self.first, self.last
 
         else:  # if no other matches, but a username is present, split that username down the middle as close as possible and edit it later.
+            self.confidence = MIDDLE_SPLIT_CONFIDENCE
             _fname_len = round(len(username) / 2)
             self.first, self.last = (
                 username[:_fname_len].title(),
@@ -306,25 +357,46 @@ class NetworkingAssistant:
             return self.greeting, self.first, self.last
 
 
-def next_grams(
-    target_list: list, target_name: str, n: int = 1
-) -> list[tuple[str, str]]:
-    """next_grams [summary]
+def contact_search_query(company_name: str, search_query: str) -> str:
+    """The search that looks for someone to address at company_name."""
+    return f'"{company_name}" {search_query}'
 
-    Args:
-        target_list (list): [description]
-        target_name (str): [description]
-        n (int, optional): [description]. Defaults to 1.
 
-    Returns:
-        list[tuple[str,str]]: Return a list of n-grams (tuples of n successive words) for this
-    blob, which in this case is the self.first and self.last name.
-    """
-    return [
-        (target_list[i], (camel_case_split(str(target_list[i + n])))[0])
-        for i, word in enumerate(target_list)
-        if word is target_name
-    ]
+def google_search(query: str) -> Iterable[str]:
+    """google_search yields the first three Google results for query, pausing between requests."""
+    from googlesearch import search
+
+    return search(
+        query=query,
+        start=0,
+        stop=3,
+        pause=4,
+        country="US",
+        verify_ssl=False,
+    )
+
+
+def _timed_chunks(chunks: Iterator[str], seconds: list[float]) -> Iterator[str]:
+    """Yields chunks, adding the time spent waiting for each one to seconds[0]."""
+    try:
+        while True:
+            start = perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                seconds[0] += perf_counter() - start
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def _get_tld(link: str):
+    """Parses link with tld, which is only imported the first time a link needs it."""
+    from tld import get_tld
+
+    return get_tld(link, fail_silently=True, as_object=True)
 
 
 def camel_case_split(text: str) -> list:
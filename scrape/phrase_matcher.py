@@ -0,0 +1,69 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+from scrape.configs import PersonaConfig
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def normalise(text: str) -> list[str]:
+    """Lowercases text and splits it into word tokens, dropping punctuation.
+    Tokens like "c++" and "c#" are kept whole.
+    """
+    return _TOKEN.findall(text.lower())
+
+
+class PhraseMatcher:
+    """Finds which of a fixed set of (possibly multi-word) phrases occur in a text,
+    in one linear pass over the text's tokens. Phrases are grouped under labels,
+    e.g. "skills" and "tools".
+    """
+
+    def __init__(self, phrases_by_label: Mapping[str, Iterable[str]]):
+        self.labels: tuple[str, ...] = tuple(phrases_by_label)
+        self._by_first_token: dict[str, list[tuple[tuple[str, ...], str, str]]] = {}
+        for label, phrases in phrases_by_label.items():
+            for phrase in phrases:
+                tokens = tuple(normalise(phrase))
+                if tokens:
+                    self._by_first_token.setdefault(tokens[0], []).append(
+                        (tokens, label, phrase)
+                    )
+        for candidates in self._by_first_token.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    def match(self, text: str) -> dict[str, list[str]]:
+        """match finds every phrase that occurs in text.
+
+        Args:
+            text (str): plain text, e.g. a job description with its tags stripped.
+
+        Returns:
+            dict[str, list[str]]: for each label, the phrases found, in order of first appearance.
+            Where several phrases start at the same word, only the longest counts.
+        """
+        found: dict[str, dict[str, None]] = {label: {} for label in self.labels}
+        tokens = normalise(text)
+        for idx, token in enumerate(tokens):
+            for phrase_tokens, label, phrase in self._by_first_token.get(token, ()):
+                if tuple(tokens[idx : idx + len(phrase_tokens)]) == phrase_tokens:
+                    found[label][phrase] = None
+                    break
+        return {label: list(phrases) for label, phrases in found.items()}
+
+    def match_many(self, texts: Iterable[str]) -> list[dict[str, list[str]]]:
+        """match_many scores a whole batch of texts, e.g. every job description on a page."""
+        return [self.match(text) for text in texts]
+
+
+def get_persona_matcher(persona: PersonaConfig) -> PhraseMatcher:
+    """Returns the PhraseMatcher over the persona's skills and tools, compiled once per process."""
+    return _build_persona_matcher(tuple(persona.skills), tuple(persona.tools))
+
+
+@lru_cache(maxsize=None)
+def _build_persona_matcher(
+    skills: tuple[str, ...], tools: tuple[str, ...]
+) -> PhraseMatcher:
+    return PhraseMatcher({"skills": skills, "tools": tools})
@@ -0,0 +1,421 @@
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from queue import Queue
+from typing import Any, Callable, Iterable, Optional
+
+from tqdm import tqdm
+
+from scrape.builtin_getter import (
+    ListingRow,
+    company_lookup,
+    iter_listing_rows,
+    make_company_result,
+)
+from scrape.bundle import LetterBundle
+from scrape.cache import TTLCache
+from scrape.coalesce import Coalescer
+from scrape.company_result import CompanyResult
+from scrape.configs import JobScrapeConfig, PersonaConfig
+from scrape.contact_cache import ContactCache
+from scrape.job_index import JobIndex
+from scrape.journal import CheckpointJournal, company_key, job_key
+from scrape.listing_body import ListingBody
+from scrape.log import logger
+from scrape.metrics import metrics
+from scrape.networkingasst import (
+    BusinessCard,
+    NetworkingAssistant,
+    SearchFunc,
+    contact_search_query,
+)
+from scrape.relevance import RelevanceScorer, get_relevance_scorer
+from scrape.render_pool import RenderJob, RenderPool, RenderResult
+from scrape.result_store import ResultStore
+from scrape.search import SearchQueue
+
+_DONE = object()
+
+
+@dataclass
+class StageCounter:
+    """How many items a pipeline stage passed downstream, and how many it dropped on errors."""
+
+    name: str
+    processed: int = 0
+    failed: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.processed += 1
+
+
+class Pipeline:
+    """Pipeline streams jobs through four stages: listing -> company lookup -> contact discovery -> render.
+
+    The stages run on their own threads and are connected by bounded queues, so each
+    CompanyResult moves downstream as soon as it is ready, and a slow stage makes the
+    stages upstream of it wait instead of buffering whole pages.
+
+    With a CheckpointJournal, every completed stage is recorded, and work that the
+    journal already holds from a previous run is skipped.
+    """
+
+    def __init__(
+        self,
+        config: JobScrapeConfig,
+        persona: PersonaConfig,
+        render_pool: RenderPool,
+        cache: Optional[TTLCache] = None,
+        journal: Optional[CheckpointJournal] = None,
+        search: Optional[SearchFunc] = None,
+        contact_cache: Optional[ContactCache] = None,
+        bundle: Optional[LetterBundle] = None,
+        store: Optional[ResultStore] = None,
+        index: Optional[JobIndex] = None,
+    ):
+        self.config = config
+        self.persona = persona
+        self.render_pool = render_pool
+        self.cache = cache
+        self.journal = journal
+        self.search = search
+        self.contact_cache = contact_cache
+        self.bundle = bundle
+        self.store = store
+        self.index = index
+        self.relevance: Optional[RelevanceScorer] = (
+            get_relevance_scorer(persona)
+            if config.relevance_threshold > 0 or config.relevance_top_k > 0
+            else None
+        )
+        self.irrelevant = 0
+        self.resumed = 0
+        # job keys this run is done with: rendered, already journaled, or dropped as irrelevant
+        self.finished: set[str] = set()
+        self.queue_size = max(config.pipeline_queue_size, 1)
+        self.lookups: Coalescer[dict] = Coalescer("company lookup")
+        self.contacts: Coalescer[BusinessCard] = Coalescer("contact discovery")
+        self.counters = {
+            name: StageCounter(name) for name in ("listing", "lookup", "contact", "render")
+        }
+
+    def run(self, listing_pages: Iterable[tuple[int, Any]]) -> list[RenderResult]:
+        """run pushes every job on the listing pages through the pipeline.
+
+        Args:
+            listing_pages (Iterable[tuple[int, Any]]): (page, listing JSON) pairs, e.g. from iter_listing_pages.
+
+        Returns:
+            list[RenderResult]: one result per cover letter sent to the render pool.
+        """
+        rows: Queue = Queue(maxsize=self.queue_size)
+        companies: Queue = Queue(maxsize=self.queue_size)
+        lister = threading.Thread(
+            target=self._list_jobs,
+            args=(listing_pages, rows),
+            name="jobscraper-listing",
+            daemon=True,
+        )
+        threads = self._start_stage(
+            "lookup", self.lookup_company, rows, companies, self.config.lookup_workers
+        )
+        return self._write_letters(lister, threads, companies)
+
+    def run_companies(self, companies: Iterable[CompanyResult]) -> list[RenderResult]:
+        """run_companies pushes companies that were already looked up, e.g. from a ResultStore,
+        through contact discovery and rendering, skipping the listing and lookup stages.
+
+        Returns:
+            list[RenderResult]: one result per cover letter sent to the render pool.
+        """
+        inbox: Queue = Queue(maxsize=self.queue_size)
+        feeder = threading.Thread(
+            target=self._feed_companies,
+            args=(companies, inbox),
+            name="jobscraper-results",
+            daemon=True,
+        )
+        return self._write_letters(feeder, [], inbox)
+
+    def _write_letters(
+        self,
+        source: threading.Thread,
+        threads: list[threading.Thread],
+        companies: Queue,
+    ) -> list[RenderResult]:
+        """Runs contact discovery and rendering on the companies that the source thread
+        and the other upstream threads put on the companies queue.
+        """
+        contacts: Queue = Queue(maxsize=self.queue_size)
+        threads = [source] + threads
+        threads += self._start_stage(
+            "contact",
+            self.discover_contact,
+            companies,
+            contacts,
+            self.config.contact_workers,
+        )
+        source.start()
+
+        self._render(contacts)
+        for thread in threads:
+            thread.join()
+        results = self.render_pool.results()
+        logger.info(
+            "Pipeline: "
+            + ", ".join(
+                f"{counter.name} {counter.processed} ok/{counter.failed} failed"
+                for counter in self.counters.values()
+            )
+        )
+        logger.info(f"{self.lookups.summary()}; {self.contacts.summary()}")
+        if self.irrelevant:
+            logger.info(f"Dropped {self.irrelevant} jobs that were a poor match for the persona.")
+        if self.resumed:
+            logger.info(f"Skipped {self.resumed} jobs already finished by a previous run.")
+        return results
+
+    def lookup_company(self, row: ListingRow) -> CompanyResult:
+        company_dict = self.lookups.get(
+            row.alias,
+            lambda: self._journaled(
+                company_key(row.alias),
+                "lookup",
+                lambda: company_lookup(
+                    row.alias, cache=self.cache, base_url=self.config.url_company
+                ),
+            ),
+        )
+        company = make_company_result(row, company_dict)
+        if self.store is not None:
+            self.store.append(company)
+        if self.index is not None:
+            self.index.add(company)
+        self._prefetch_search(company)
+        return company
+
+    def _prefetch_search(self, company: CompanyResult) -> None:
+        """Starts the contact search for a company as soon as it is looked up, if the
+        search runs on a SearchQueue, so that the contact stage finds it done or under way.
+        Companies whose contact is already journaled or cached are not searched.
+        """
+        if not isinstance(self.search, SearchQueue):
+            return
+        if self.journal is not None and self.journal.completed(
+            company_key(company.alias), "contact"
+        ):
+            return
+        if self.contact_cache is not None and self.contact_cache.usable(company.alias):
+            return
+        self.search.submit(
+            contact_search_query(company.company_name, self.config.search_query)
+        )
+
+    def discover_contact(
+        self, company: CompanyResult
+    ) -> tuple[CompanyResult, BusinessCard]:
+        """Finds the contact for a company once; its other jobs share the same BusinessCard."""
+
+        def schmooze() -> BusinessCard:
+            if self.contact_cache is not None:
+                cached = self.contact_cache.lookup(company.alias)
+                if cached is not None:
+                    return cached
+            networkingasst = NetworkingAssistant(
+                company=company, config=self.config, search=self.search
+            )
+            business_card = networkingasst.gratuitous_schmoozing()
+            if self.contact_cache is not None:
+                self.contact_cache.store(
+                    company.alias, business_card, networkingasst.candidate_links
+                )
+            return business_card
+
+        return company, self.contacts.get(
+            company.alias,
+            lambda: self._journaled(
+                company_key(company.alias),
+                "contact",
+                schmooze,
+                encode=asdict,
+                decode=lambda payload: BusinessCard(**payload),
+            ),
+        )
+
+    def _journaled(
+        self,
+        key: str,
+        stage: str,
+        work: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda result: result,
+        decode: Callable[[Any], Any] = lambda payload: payload,
+    ) -> Any:
+        """Returns the journal's record of stage for key if a previous run completed it,
+        otherwise does the work and records it.
+        """
+        if self.journal is not None and self.journal.completed(key, stage):
+            return decode(self.journal.payload(key, stage))
+        result = work()
+        if self.journal is not None and result:
+            self.journal.record(key, stage, encode(result))
+        return result
+
+    def _list_jobs(self, listing_pages: Iterable[tuple[int, Any]], outbox: Queue) -> None:
+        try:
+            for page, docs in listing_pages:
+                try:
+                    self._list_page(page, docs, outbox)
+                except (KeyError, TypeError, AttributeError, ValueError) as error_found:
+                    self.counters["listing"].count(failed=True)
+                    logger.error(f"Could not read listing page {page}: {error_found}")
+                finally:
+                    if isinstance(docs, ListingBody):
+                        docs.close()
+        finally:
+            if hasattr(listing_pages, "close"):
+                listing_pages.close()  # lets iter_listing_pages close any pages not read
+            outbox.put(_DONE)
+
+    def _list_page(self, page: int, docs: Any, outbox: Queue) -> None:
+        rows: Iterable[ListingRow] = iter_listing_rows(docs, page)
+        if self.relevance is not None:
+            # ranking needs the whole page, so a streamed page is held in full here
+            rows = self._relevant(list(rows), page)
+        for row in rows:
+            key = job_key(row.alias, row.job_id, row.job_name)
+            if self.journal is not None and self.journal.completed(key, "render"):
+                self.finished.add(key)
+                self.resumed += 1
+                continue
+            self.counters["listing"].count()
+            outbox.put(row)
+
+    def _feed_companies(self, companies: Iterable[CompanyResult], outbox: Queue) -> None:
+        try:
+            for company in companies:
+                if self.journal is not None and self.journal.completed(
+                    job_key(company.alias, company.job_id, company.job_name), "render"
+                ):
+                    self.resumed += 1
+                    continue
+                self.counters["listing"].count()
+                if self.store is not None:
+                    self.store.append(company)
+                self._prefetch_search(company)
+                outbox.put(company)
+        finally:
+            outbox.put(_DONE)
+
+    def _relevant(self, rows: list[ListingRow], page: int) -> list[ListingRow]:
+        """Ranks one page's jobs by how well they match the persona, and keeps the best of them:
+        those scoring at least relevance_threshold, and no more than relevance_top_k.
+        """
+        with metrics.timer("relevance"):
+            kept = self.relevance.select(
+                [row.job_description for row in rows],
+                threshold=self.config.relevance_threshold,
+                top_k=self.config.relevance_top_k,
+            )
+        dropped = len(rows) - len(kept)
+        self.irrelevant += dropped
+        kept_idx = {idx for idx, _ in kept}
+        self.finished.update(
+            job_key(row.alias, row.job_id, row.job_name)
+            for idx, row in enumerate(rows)
+            if idx not in kept_idx
+        )
+        metrics.inc("relevance", "dropped", dropped)
+        logger.info(f"Page {page}: keeping {len(kept)} of {len(rows)} jobs by relevance.")
+        for idx, score in kept:
+            logger.debug(f"{rows[idx].job_name} at {rows[idx].company_name}: relevance {score:.3f}")
+        return [rows[idx] for idx, _ in kept]
+
+    def _start_stage(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        inbox: Queue,
+        outbox: Queue,
+        workers: int,
+    ) -> list[threading.Thread]:
+        """Starts `workers` threads that apply func to each item in inbox and pass the result to outbox.
+        The last worker to finish tells the next stage that no more items are coming.
+        """
+        counter = self.counters[name]
+        remaining = [max(workers, 1)]
+        lock = threading.Lock()
+
+        def work() -> None:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    inbox.put(_DONE)  # let this stage's other workers see it too
+                    break
+                try:
+                    result = func(item)
+                except Exception as error_found:
+                    counter.count(failed=True)
+                    logger.error(f"{name} failed for {item}: {error_found!r}")
+                    continue
+                counter.count()
+                outbox.put(result)
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    outbox.put(_DONE)
+
+        threads = [
+            threading.Thread(target=work, name=f"jobscraper-{name}-{idx}", daemon=True)
+            for idx in range(remaining[0])
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _render(self, inbox: Queue) -> None:
+        """Sends each (company, contact) pair to the render pool, keeping at most
+        queue_size letters in flight so that rendering applies backpressure too.
+        """
+        in_flight: deque = deque()
+        progress = tqdm(desc="Writing Cover Letters", unit="letter")
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            company, business_card = item
+            logger.info(
+                f"Writing cover letter to {business_card.fullname} at {business_card.workplace} for the role of {company.job_name}"
+            )
+            future = self.render_pool.submit(
+                RenderJob(
+                    company,
+                    contact=business_card,
+                    persona=self.persona,
+                    config=self.config,
+                )
+            )
+            in_flight.append(future)
+            self.counters["render"].count()
+            progress.update()
+            while len(in_flight) > self.queue_size:
+                self._record_render(in_flight.popleft())
+        while in_flight:
+            self._record_render(in_flight.popleft())
+        progress.close()
+
+    def _record_render(self, future: Future) -> None:
+        """Waits for a letter, then adds it to the bundle and journals it, in the order the letters were sent."""
+        result: RenderResult = future.result()
+        if self.bundle is not None:
+            self.bundle.add(result)
+        if not result.error:
+            key = job_key(result.alias, result.job_id, result.job_name)
+            self.finished.add(key)
+            if self.journal is not None:
+                self.journal.record(key, "render", result.paths)
@@ -0,0 +1,103 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Sequence
+
+from scrape.configs import PersonaConfig
+from scrape.phrase_matcher import normalise
+from scrape.striptags import strip_tags
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class RelevanceScorer:
+    """Scores a batch of job descriptions against a persona's skills and tools with TF-IDF.
+
+    The vocabulary is the persona's own: every skill and tool as a phrase, plus each word
+    in them. A batch becomes one (jobs x vocabulary) NumPy matrix of log-scaled term counts,
+    weighted by inverse document frequency across the batch, and each job scores the cosine
+    similarity between its row and the persona's profile. Multi-word phrases weigh more in
+    the profile than the single words they are made of.
+    """
+
+    def __init__(self, skills: Sequence[str], tools: Sequence[str]):
+        features: dict[tuple[str, ...], float] = {}
+        for phrase in (*skills, *tools):
+            tokens = tuple(normalise(phrase))
+            if not tokens:
+                continue
+            features[tokens] = max(features.get(tokens, 0.0), float(len(tokens)))
+            for token in tokens:
+                features.setdefault((token,), 1.0)
+        self.features: tuple[tuple[str, ...], ...] = tuple(features)
+        self._weights = tuple(features.values())
+        self._by_first_token: dict[str, list[tuple[int, tuple[str, ...]]]] = {}
+        for idx, tokens in enumerate(self.features):
+            self._by_first_token.setdefault(tokens[0], []).append((idx, tokens))
+
+    def counts(self, texts: Sequence[str]) -> "np.ndarray":
+        """counts tallies how often each persona term occurs in each text, tags stripped.
+
+        Returns:
+            np.ndarray: a (len(texts) x vocabulary) matrix of term counts.
+        """
+        import numpy as np
+
+        matrix = np.zeros((len(texts), len(self.features)))
+        for row, text in enumerate(texts):
+            tokens = normalise(strip_tags(text or ""))
+            for idx, token in enumerate(tokens):
+                for feature, feature_tokens in self._by_first_token.get(token, ()):
+                    if tuple(tokens[idx : idx + len(feature_tokens)]) == feature_tokens:
+                        matrix[row, feature] += 1
+        return matrix
+
+    def score(self, texts: Sequence[str]) -> "np.ndarray":
+        """score rates every text in the batch from 0 (nothing in common with the persona) to 1.
+
+        Returns:
+            np.ndarray: one score per text, in the same order as texts.
+        """
+        import numpy as np
+
+        if not texts or not self.features:
+            return np.zeros(len(texts))
+        tf = np.log1p(self.counts(texts))
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+        jobs = tf * idf
+        profile = np.asarray(self._weights) * idf
+        norms = np.linalg.norm(jobs, axis=1) * np.linalg.norm(profile)
+        return np.divide(jobs @ profile, norms, out=np.zeros(len(texts)), where=norms > 0)
+
+    def select(
+        self, texts: Sequence[str], threshold: float = 0.0, top_k: int = 0
+    ) -> list[tuple[int, float]]:
+        """select ranks the batch and keeps the texts worth writing for.
+
+        Args:
+            texts (Sequence[str]): the job descriptions on one listing page.
+            threshold (float, optional): the lowest score kept. Defaults to 0.0, which keeps every score.
+            top_k (int, optional): the most texts kept. Defaults to 0, for no limit.
+
+        Returns:
+            list[tuple[int, float]]: the (index, score) of each text kept, best first.
+        """
+        scores = self.score(texts)
+        ranked = [
+            (int(idx), float(scores[idx]))
+            for idx in (-scores).argsort(kind="stable")
+            if scores[idx] >= threshold
+        ]
+        return ranked[:top_k] if top_k > 0 else ranked
+
+
+def get_relevance_scorer(persona: PersonaConfig) -> RelevanceScorer:
+    """Returns the RelevanceScorer for the persona's skills and tools, built once per process."""
+    return _build_relevance_scorer(tuple(persona.skills), tuple(persona.tools))
+
+
+@lru_cache(maxsize=None)
+def _build_relevance_scorer(
+    skills: tuple[str, ...], tools: tuple[str, ...]
+) -> RelevanceScorer:
+    return RelevanceScorer(skills, tools)
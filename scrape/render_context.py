@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from scrape.configs import JobScrapeConfig
+
+
+@dataclass(frozen=True)
+class RenderContext:
+    """Everything a cover letter PDF needs that is the same for every letter:
+    the paragraph styles and the SimpleDocTemplate page settings.
+    Both are read-only, so one context can be shared by every CoverLetterWriter.
+    """
+
+    styles: Mapping[str, Any]
+    doc_settings: Mapping[str, Any]
+
+
+def get_render_context(config: JobScrapeConfig) -> RenderContext:
+    """Returns the process-wide RenderContext for the fonts named in config."""
+    return _build_render_context(
+        config.font_regular,
+        config.font_bold,
+        config.font_italic,
+        config.font_bolditalic,
+    )
+
+
+@lru_cache(maxsize=None)
+def _build_render_context(
+    font_regular: str, font_bold: str, font_italic: str, font_bolditalic: str
+) -> RenderContext:
+    register_fonts(font_regular, font_bold, font_italic, font_bolditalic)
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+
+    doc_settings = MappingProxyType(
+        {
+            "pagesize": letter,
+            "rightMargin": 1 * inch,
+            "leftMargin": 1 * inch,
+            "topMargin": 1.25 * inch,
+            "bottomMargin": 1.25 * inch,
+        }
+    )
+    return RenderContext(styles=build_styles(), doc_settings=doc_settings)
+
+
+def register_fonts(
+    font_regular: str, font_bold: str, font_italic: str, font_bolditalic: str
+) -> None:
+    """This registers the IBM Plex fonts for use in the PDF. The TTF files are parsed once per process."""
+    import reportlab.rl_config
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    reportlab.rl_config.warnOnMissingFontGlyphs = 0
+    pdfmetrics.registerFont(TTFont("IBMPlex", font_regular))
+    pdfmetrics.registerFont(TTFont("IBMPlexBd", font_bold))
+    pdfmetrics.registerFont(TTFont("IBMPlexIt", font_italic))
+    pdfmetrics.registerFont(TTFont("IBMPlexBI", font_bolditalic))
+    pdfmetrics.registerFontFamily(
+        "IBMPlex",
+        normal="IBMPlex",
+        bold="IBMPlexBd",
+        italic="IBMPlexIt",
+        boldItalic="IBMPlexBI",
+    )
+
+
+def build_styles() -> Mapping[str, Any]:
+    """This builds the sample stylesheet plus the Main, MainBody and ListItem styles, as a read-only mapping."""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(
+            "Main",
+            parent=styles["Normal"],
+            fontName="IBMPlex",
+            spaceBefore=16,
+            fontSize=12,
+            leading=16,
+            firstLineIndent=0,
+        )
+    )
+
+    styles.add(ParagraphStyle("MainBody", parent=styles["Main"], firstLineIndent=16))
+
+    styles.add(
+        ParagraphStyle(
+            "ListItem",
+            parent=styles["Main"],
+            spaceBefore=8,
+            firstLineIndent=16,
+            bulletText="•",
+        )
+    )
+    return MappingProxyType(dict(styles.byName))
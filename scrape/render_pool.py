@@ -0,0 +1,128 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from scrape.company_result import CompanyResult
+from scrape.configs import JobScrapeConfig, PersonaConfig
+from scrape.coverletterwriter import CoverLetterWriter
+from scrape.log import logger
+from scrape.metrics import metrics
+from scrape.networkingasst import BusinessCard
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    """Everything a worker process needs to write one cover letter."""
+
+    company: CompanyResult
+    contact: BusinessCard
+    persona: PersonaConfig
+    config: JobScrapeConfig
+
+
+@dataclass
+class RenderResult:
+    """The outcome of one RenderJob: the files it wrote, or the error that stopped it.
+
+    For bundled exports nothing is written by the worker: files holds each file's
+    contents by its name within the archive until a LetterBundle takes them, and
+    paragraphs holds the letter's markup for the combined PDF.
+    """
+
+    company_name: str
+    job_name: str
+    alias: str = ""
+    job_id: str = ""
+    paths: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+    timings: dict[str, float] = field(default_factory=dict)
+    files: dict[str, bytes] = field(default_factory=dict)
+    paragraphs: list[tuple[str, str]] = field(default_factory=list)
+
+
+def render_letter(job: RenderJob) -> RenderResult:
+    """Writes one cover letter. Runs inside a worker process, so every error is caught
+    and reported in the RenderResult rather than raised across the process boundary.
+    """
+    result = RenderResult(
+        company_name=job.company.company_name,
+        job_name=job.company.job_name,
+        alias=job.company.alias,
+        job_id=job.company.job_id,
+    )
+    try:
+        writer = CoverLetterWriter(
+            job.company, contact=job.contact, persona=job.persona, config=job.config
+        )
+        if job.config.export_mode == "files":
+            result.paths = writer.write()
+        else:
+            result.files = writer.render()
+        if job.config.export_combined_pdf:
+            result.paragraphs = writer.paragraphs()
+        result.timings = writer.timings
+    except Exception as error_found:
+        result.error = repr(error_found)
+    return result
+
+
+class RenderPool:
+    """Sends RenderJobs to a pool of worker processes, so that rendering scales with cores.
+
+    With workers=1 the letters are rendered inline, in this process.
+    With workers=0 the pool uses one worker per core.
+
+    The workers are spawned rather than forked: they start once the pipeline's threads
+    are running, and forking a process with running threads can deadlock the child.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            if self.workers > 1
+            else None
+        )
+        self._futures: list[Future] = []
+
+    def submit(self, job: RenderJob) -> Future:
+        if self._executor is None:
+            future: Future = Future()
+            future.set_result(render_letter(job))
+        else:
+            future = self._executor.submit(render_letter, job)
+        self._futures.append(future)
+        return future
+
+    def results(self) -> list[RenderResult]:
+        """results waits for every submitted job and logs the outcome for each company.
+
+        Returns:
+            list[RenderResult]: one result per submitted job, in submission order.
+        """
+        results = [future.result() for future in self._futures]
+        self._futures.clear()
+        for result in results:
+            for stage, seconds in result.timings.items():
+                metrics.observe(stage, seconds)
+            if result.error:
+                logger.error(
+                    f"Could not write the cover letter for {result.job_name} at {result.company_name}: {result.error}"
+                )
+            else:
+                logger.debug(f"Wrote {result.paths}")
+        return results
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
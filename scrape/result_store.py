@@ -0,0 +1,124 @@
+import sys
+import threading
+from dataclasses import fields
+from typing import Any, Iterable, Iterator
+
+from scrape.company_result import CompanyResult, intern_strings
+from scrape.dir import make_export_dir
+
+FIELDS: tuple[str, ...] = tuple(f.name for f in fields(CompanyResult))
+LIST_FIELDS = frozenset({"industries", "adjectives"})
+# company-level fields, repeated for every job at the company: dictionary-encoded in Arrow
+COMPANY_FIELDS = frozenset(
+    {
+        "alias",
+        "company_name",
+        "company_desc",
+        "url",
+        "twitter",
+        "email",
+        "street_address",
+        "suite",
+        "city",
+        "state",
+        "zip",
+    }
+)
+
+
+class ResultStore:
+    """A run's CompanyResults, kept as one list per field, so that they convert
+    straight into an Arrow table with one column per field.
+
+    Results can be saved to and loaded from Parquet, so they can be analysed in bulk or
+    turned into cover letters again without scraping BuiltIn a second time. pyarrow is
+    only imported when results are converted to Arrow, saved or loaded.
+    """
+
+    def __init__(self):
+        self.columns: dict[str, list[Any]] = {name: [] for name in FIELDS}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.columns["alias"])
+
+    def __iter__(self) -> Iterator[CompanyResult]:
+        columns = [self.columns[name] for name in FIELDS]
+        for idx in range(len(self)):
+            yield CompanyResult(*(column[idx] for column in columns))
+
+    def append(self, result: CompanyResult) -> None:
+        with self._lock:
+            for name in FIELDS:
+                self.columns[name].append(getattr(result, name))
+
+    def extend(self, results: Iterable[CompanyResult]) -> None:
+        for result in results:
+            self.append(result)
+
+    def to_arrow(self):
+        """to_arrow converts the store into a pyarrow Table, one column per CompanyResult field.
+
+        Returns:
+            pyarrow.Table: the results, with the company-level columns dictionary-encoded.
+        """
+        import pyarrow as pa
+
+        with self._lock:
+            arrays = {}
+            for name in FIELDS:
+                column = self.columns[name]
+                if name == "inner_id":
+                    arrays[name] = pa.array(column, type=pa.int64())
+                elif name in LIST_FIELDS:
+                    arrays[name] = pa.array([list(values) for values in column], type=pa.list_(pa.string()))
+                elif name in COMPANY_FIELDS:
+                    arrays[name] = pa.array(column, type=pa.string()).dictionary_encode()
+                else:
+                    arrays[name] = pa.array(column, type=pa.string())
+        return pa.table(arrays)
+
+    @classmethod
+    def from_arrow(cls, table) -> "ResultStore":
+        """from_arrow builds a store from a pyarrow Table written by to_arrow.
+        Fields missing from the table, e.g. from an older file, are left empty, or 0 for inner_id.
+        """
+        store = cls()
+        rows = table.num_rows
+        for name in FIELDS:
+            if name not in table.column_names:
+                store.columns[name] = [_missing(name)] * rows
+                continue
+            column = table.column(name).to_pylist()
+            if name in LIST_FIELDS:
+                column = [intern_strings(values) for values in column]
+            elif name in COMPANY_FIELDS:
+                column = [value if value is None else sys.intern(value) for value in column]
+            store.columns[name] = column
+        return store
+
+    def save(self, file_path: str) -> str:
+        """save writes the store to file_path as a zstd-compressed Parquet file.
+
+        Returns:
+            str: the path written.
+        """
+        import pyarrow.parquet as pq
+
+        make_export_dir(file_path)
+        pq.write_table(self.to_arrow(), file_path, compression="zstd")
+        return file_path
+
+    @classmethod
+    def load(cls, file_path: str) -> "ResultStore":
+        """load reads a store saved with save."""
+        import pyarrow.parquet as pq
+
+        return cls.from_arrow(pq.read_table(file_path))
+
+
+def _missing(name: str) -> Any:
+    """The value of a field that a saved table does not have."""
+    if name == "inner_id":
+        return 0
+    return () if name in LIST_FIELDS else ""
@@ -0,0 +1,179 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from scrape.configs import JobScrapeConfig
+from scrape.fetch_engine import HostRateLimiter, get_engine
+from scrape.log import logger
+from scrape.metrics import metrics
+
+
+class SearchBackend(ABC):
+    """A source of candidate contact links for a search query.
+
+    Each backend carries its own rate budget: no more than `rate` queries start per
+    second on average, with up to `burst` at once after it has been idle. Subclasses
+    only implement search; SearchQueue takes care of the budget and the concurrency.
+    """
+
+    name = "search"
+
+    def __init__(self, rate: float = 0.25, burst: int = 1):
+        self.limiter = HostRateLimiter(rate, burst)
+
+    @abstractmethod
+    def search(self, query: str) -> list[str]:
+        """search returns the links found for query. It may block."""
+
+
+class GoogleSearch(SearchBackend):
+    """Scrapes Google's result pages with googlesearch. The rate budget replaces
+    googlesearch's own pause, which only ever spaced out one query at a time.
+    """
+
+    name = "google"
+
+    def __init__(self, rate: float = 0.25, burst: int = 1, results: int = 3):
+        super().__init__(rate, burst)
+        self.results = results
+
+    def search(self, query: str) -> list[str]:
+        from googlesearch import search
+
+        return list(
+            search(
+                query=query,
+                start=0,
+                stop=self.results,
+                pause=0.0,
+                country="US",
+                verify_ssl=False,
+            )
+        )
+
+
+class HttpSearch(SearchBackend):
+    """Asks a JSON search API, e.g. the benchmark stand-in's /search endpoint or the
+    Google Custom Search API, with the query as `q` alongside any fixed params (keys, ids...).
+
+    The response may be a plain list of links or, as Custom Search returns it,
+    an object whose "items" each have a "link".
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        rate: float = 0.25,
+        burst: int = 1,
+        results: int = 3,
+    ):
+        super().__init__(rate, burst)
+        self.url = url
+        self.params = params or {}
+        self.results = results
+
+    def search(self, query: str) -> list[str]:
+        found = get_engine().fetch(self.url, querystring={**self.params, "q": query})
+        if isinstance(found, dict):
+            found = [item["link"] for item in found.get("items", []) if "link" in item]
+        return list(found or [])[: self.results]
+
+
+class FunctionSearch(SearchBackend):
+    """Wraps any plain search function, query -> links, as a backend."""
+
+    name = "function"
+
+    def __init__(self, func, rate: float = 0.0, burst: int = 1):
+        super().__init__(rate, burst)
+        self.func = func
+
+    def search(self, query: str) -> list[str]:
+        return list(self.func(query))
+
+
+def make_search_backend(config: JobScrapeConfig) -> SearchBackend:
+    """make_search_backend builds the backend named by config.search_backend, "google" or "http"."""
+    if config.search_backend == "google":
+        return GoogleSearch(rate=config.search_rate, burst=config.search_burst)
+    if config.search_backend == "http":
+        return HttpSearch(
+            config.search_url,
+            params=config.search_params,
+            rate=config.search_rate,
+            burst=config.search_burst,
+        )
+    raise ValueError(f"Unknown search_backend {config.search_backend!r}, expected 'google' or 'http'")
+
+
+class SearchQueue:
+    """SearchQueue runs the queries for a search backend on an asyncio event loop in a
+    background thread, with up to `concurrency` of them in flight at once within the
+    backend's rate budget, instead of one after another on the caller's thread.
+
+    A SearchQueue is itself a search function, so it can be handed to NetworkingAssistant
+    as-is. Submitting a query early with submit() starts it straight away; a later call
+    for the same query waits on that same search rather than repeating it.
+    """
+
+    def __init__(self, backend: SearchBackend, concurrency: int = 4):
+        self.backend = backend
+        self.concurrency = max(concurrency, 1)
+        self.failures = 0
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix=f"jobscraper-search-{backend.name}"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="jobscraper-search-loop", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config: JobScrapeConfig):
+        return cls(make_search_backend(config), concurrency=config.search_concurrency)
+
+    def submit(self, query: str) -> Future:
+        """submit queues query, unless it is already queued, and returns the future of its links."""
+        with self._lock:
+            future = self._futures.get(query)
+            if future is None:
+                future = asyncio.run_coroutine_threadsafe(self._search(query), self._loop)
+                self._futures[query] = future
+            return future
+
+    def __call__(self, query: str) -> Iterable[str]:
+        return self.submit(query).result()
+
+    async def _search(self, query: str) -> list[str]:
+        delay = self.backend.limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        metrics.inc("search", "queries")
+        try:
+            return await self._loop.run_in_executor(
+                self._executor, self.backend.search, query
+            )
+        except Exception as error_found:
+            self.failures += 1
+            metrics.inc("search", "errors")
+            logger.warning(f"{self.backend.name} search failed for {query}: {error_found!r}")
+            return []
+
+    def close(self) -> None:
+        """close waits for the queued searches to finish, then stops the event loop."""
+        with self._lock:
+            pending = list(self._futures.values())
+        for future in pending:
+            future.exception()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._executor.shutdown(wait=True)
@@ -1,5 +1,11 @@
+import re
+from collections import deque
 from io import StringIO
 from html.parser import HTMLParser
+from typing import Iterable, Iterator
+
+WORD_JOINERS = ("", "'", "’", "-")
+WORD = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
 
 class MLStripper(HTMLParser):
     def __init__(self):
@@ -13,7 +19,63 @@ class MLStripper(HTMLParser):
     def get_data(self):
         return self.text.getvalue()
 
+class WordTokenizer(MLStripper):
+    ''' An MLStripper that splits the page's visible text into words as it is fed,
+    instead of keeping the text, so a page can be tokenised while it downloads.
+    Script, style and other non-text blocks are skipped.
+    '''
+    SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+
+    def __init__(self):
+        super().__init__()
+        self.words: deque[str] = deque()
+        self._skipping = 0
+        self._pending = ""
+    def feed(self, data):
+        super().feed(data)
+        self._flush(final=False)
+    def close(self):
+        super().close()
+        self._flush(final=True)
+    def handle_starttag(self, tag, attrs):
+        self._flush(final=True)
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+    def handle_endtag(self, tag):
+        self._flush(final=True)
+        if tag in self.SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+    def handle_data(self, d):
+        if not self._skipping:
+            self._pending += d
+    def _flush(self, final):
+        # a word running up to the end of a chunk, or up to an apostrophe or hyphen there,
+        # may carry on in the next one, so hold it back
+        matches = list(WORD.finditer(self._pending))
+        if not final and matches and self._pending[matches[-1].end():] in WORD_JOINERS:
+            self._pending = self._pending[matches.pop().start():]
+        else:
+            self._pending = ""
+        self.words.extend(match.group() for match in matches)
+
 def strip_tags(html) -> str:
     s = MLStripper()
     s.feed(html)
-    return s.get_data()
\ No newline at end of file
+    return s.get_data()
+
+def iter_words(chunks: Iterable[str]) -> Iterator[str]:
+    ''' iter_words yields the words of an HTML document fed in chunks, e.g. from
+    stream_page_text, reading the next chunk only once the words so far are used up.
+    '''
+    tokenizer = WordTokenizer()
+    chunks = iter(chunks)
+    try:
+        for chunk in chunks:
+            tokenizer.feed(chunk)
+            while tokenizer.words:
+                yield tokenizer.words.popleft()
+        tokenizer.close()
+        yield from tokenizer.words
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()  # stop the download too
@@ -0,0 +1,25 @@
+from functools import lru_cache
+from typing import Iterable
+
+
+class TokenFilter:
+    """A frozen hash set of stopwords, for dropping common words from scraped text.
+    Tokens are lowercased before the lookup; the stopwords are kept as given.
+    """
+
+    def __init__(self, stopwords: Iterable[str]):
+        self.stopwords: frozenset[str] = frozenset(stopwords)
+
+    def __contains__(self, token: str) -> bool:
+        return token.lower() in self.stopwords
+
+    def __len__(self) -> int:
+        return len(self.stopwords)
+
+
+@lru_cache(maxsize=None)
+def get_webtext_filter() -> TokenFilter:
+    """Builds the TokenFilter over the NLTK webtext corpus once per process."""
+    from nltk.corpus import webtext
+
+    return TokenFilter(webtext.words())
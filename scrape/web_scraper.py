@@ -1,55 +1,56 @@
-from json import loads
-from json.decoder import JSONDecodeError
-from time import sleep
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
-from bs4 import BeautifulSoup
-from requests import get
-from requests.exceptions import HTTPError, RequestException
-
-from scrape.log import logger
+from scrape.fetch_engine import ConditionalFetch, get_engine
+from scrape.listing_body import ListingBody
 
 
 def webscrape_results(
-    target_url: str, run_beautiful_soup: bool = False, querystring: Optional[str] = None
+    target_url: str, run_beautiful_soup: bool = False, querystring: Optional[dict] = None
 ) -> Any:
     """webscrape_results takes a target_url, id and querystring to extract results for further parsing purposes.
+    Requests go through the shared FetchEngine, which pools connections and rate limits per host.
 
     Args:
         - target_url (str): a website to be scraped
-        - id (int, optional): an ID that determines the output.
-            1 is for JSON scraping.
-            2 is for HTML scraping with BeautifulSoup.
-        Defaults to 1.
-        - querystring (Optional[str], optional): A querystring to govern the requested results. Defaults to None.
+        - run_beautiful_soup (bool, optional): False is for JSON scraping.
+            True is for HTML scraping with BeautifulSoup.
+        Defaults to False.
+        - querystring (Optional[dict], optional): A querystring to govern the requested results. Defaults to None.
 
     Returns:
         Any: Is either text from JSON, text from BeautifulSoup, or None if no results were found.
     """
-    sleep(2)
-    try:
-        r = get(target_url, params=querystring)
-        if r.ok:
-            response_text = r.text
-            try:
-                if not run_beautiful_soup:
-                    return loads(response_text)
-                elif run_beautiful_soup:
-                    return BeautifulSoup(response_text, "html.parser")
-            except (
-                JSONDecodeError,
-                RequestException,
-                HTTPError,
-                AttributeError,
-            ) as exception:
-                logger.warning(
-                    f"[jobscraper] An error has occurred, moving to next item in sequence.\
-                    Cause of error: {exception}"
-                )
-        else:
-            logger.debug(r.status_code)
-    except (JSONDecodeError, RequestException, HTTPError, AttributeError) as exception:
-        logger.warning(
-            f"[jobscraper] An error has occurred, moving to next item in sequence.\
-            Cause of error: {exception}"
-        )
+    return get_engine().fetch(
+        target_url, run_beautiful_soup=run_beautiful_soup, querystring=querystring
+    )
+
+
+def webscrape_spooled(
+    target_url: str, querystring: Optional[dict] = None
+) -> Optional[ListingBody]:
+    """webscrape_spooled is webscrape_results for large JSON listings: the body is spooled
+    to a temporary file as it downloads, to be decoded a record at a time.
+    """
+    return get_engine().fetch_spooled(target_url, querystring=querystring)
+
+
+def webscrape_conditional(
+    target_url: str,
+    querystring: Optional[dict] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> ConditionalFetch:
+    """webscrape_conditional is webscrape_results for JSON that may not have changed since
+    the last fetch: given that fetch's ETag or Last-Modified, an unchanged resource comes back
+    as not_modified instead of being downloaded again.
+    """
+    return get_engine().fetch_conditional(
+        target_url, querystring=querystring, etag=etag, last_modified=last_modified
+    )
+
+
+def stream_page_text(target_url: str, max_bytes: int = 512_000) -> Iterator[str]:
+    """stream_page_text yields the text of target_url's page source as it downloads,
+    reading no more than max_bytes of it. Stop iterating to drop the rest of the page.
+    """
+    return get_engine().stream(target_url, max_bytes=max_bytes)
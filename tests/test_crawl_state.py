@@ -0,0 +1,27 @@
+from scrape.crawl_state import CrawlState
+
+
+def test_commit_only_remembers_finished_jobs(tmp_path):
+    state_path = str(tmp_path / "crawl_state.json")
+    state = CrawlState(state_path)
+    state.record("q", 1, ["job:a/1", "job:b/2"], etag='"one"')
+    state.record("q", 2, ["job:c/3"], etag='"two"')
+    state.commit(finished={"job:a/1", "job:c/3"})
+
+    reloaded = CrawlState(state_path)
+    assert reloaded.seen("q") == {"job:a/1", "job:c/3"}
+    assert reloaded.validators("q", 1) == (None, None)
+    assert reloaded.validators("q", 2) == ('"two"', None)
+
+
+def test_commit_drops_stale_validators_of_a_page_with_failed_jobs(tmp_path):
+    state_path = str(tmp_path / "crawl_state.json")
+    state = CrawlState(state_path)
+    state.record("q", 1, ["job:a/1"], etag='"old"')
+    state.commit()
+    state.record("q", 1, ["job:b/2"], etag='"new"')
+    state.commit(finished=set())
+
+    reloaded = CrawlState(state_path)
+    assert reloaded.seen("q") == {"job:a/1"}
+    assert reloaded.validators("q", 1) == (None, None)
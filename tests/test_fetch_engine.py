@@ -0,0 +1,96 @@
+from typing import Optional
+
+import pytest
+from requests.exceptions import TooManyRedirects
+
+from scrape.fetch_engine import CircuitBreaker, FetchEngine, HostRateLimiter
+
+
+def test_retry_after_pause_holds_requests_despite_burst():
+    limiter = HostRateLimiter(0.5, burst=8)
+    assert limiter.reserve() == 0
+    limiter.decrease(pause=10)
+    assert limiter.reserve() > 9.5
+    assert limiter.reserve() > 9.5
+
+
+def test_decrease_halves_rate_without_explicit_min_rate():
+    limiter = HostRateLimiter(0.5, burst=8)
+    limiter.decrease()
+    assert limiter.rate == 0.25
+    for _ in range(10):
+        limiter.decrease()
+    assert limiter.rate == 0.5 / 8
+
+
+class _Response:
+    def __init__(self, status_code: int, headers: Optional[dict] = None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.content = b""
+
+    def close(self) -> None:
+        pass
+
+
+class _Session:
+    def __init__(self, outcomes: list):
+        self.outcomes = outcomes
+
+    def get(self, *args, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self) -> None:
+        pass
+
+
+def _engine(outcomes: list) -> tuple[FetchEngine, CircuitBreaker]:
+    engine = FetchEngine(
+        requests_per_second=0.0, max_retries=0, circuit_failures=2, circuit_cooldown=0.0
+    )
+    _, limiter, breaker = engine._host_state("http://example.test/")
+    engine._sessions["example.test"] = _Session(outcomes)
+    return engine, breaker
+
+
+def test_throttled_trial_request_lets_a_later_trial_through():
+    engine, breaker = _engine(
+        [_Response(503), _Response(503), _Response(429), _Response(200)]
+    )
+    try:
+        assert engine.get("http://example.test/").status_code == 503
+        assert engine.get("http://example.test/").status_code == 503
+        assert breaker.is_open
+        assert engine.get("http://example.test/").status_code == 429
+        assert engine.get("http://example.test/").status_code == 200
+        assert not breaker.is_open
+    finally:
+        engine.close()
+
+
+def test_unexpected_error_in_trial_request_lets_a_later_trial_through():
+    engine, breaker = _engine(
+        [_Response(503), _Response(503), TooManyRedirects("loop"), _Response(200)]
+    )
+    try:
+        engine.get("http://example.test/")
+        engine.get("http://example.test/")
+        with pytest.raises(TooManyRedirects):
+            engine.get("http://example.test/")
+        assert engine.get("http://example.test/").status_code == 200
+    finally:
+        engine.close()
+
+
+def test_retry_after_is_capped_at_backoff_cap():
+    engine, _ = _engine([_Response(503, {"Retry-After": "7200"}), _Response(200)])
+    engine.max_retries = 1
+    engine.backoff_cap = 0.01
+    try:
+        assert engine.get("http://example.test/").status_code == 200
+    finally:
+        engine.close()
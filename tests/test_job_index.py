@@ -0,0 +1,45 @@
+import pytest
+
+from scrape.company_result import CompanyResult
+from scrape.job_index import JobIndex
+
+
+def _company(job_name: str, job_id: str) -> CompanyResult:
+    return CompanyResult(
+        inner_id=0,
+        alias="acme",
+        company_name="Acme",
+        company_desc="",
+        job_name=job_name,
+        job_description="<p>Lead our user research practice.</p>",
+        url="",
+        twitter="",
+        email="",
+        street_address="",
+        suite="",
+        city="New York",
+        state="NY",
+        zip="",
+        industries=("fintech",),
+        job_id=job_id,
+    )
+
+
+def test_search_finds_indexed_jobs(tmp_path):
+    index = JobIndex(str(tmp_path / "jobs.sqlite"))
+    index.add(_company("Design Director", "1"))
+    index.add(_company("Data Engineer", "2"))
+    try:
+        found = index.search('job_name:director AND "user research"')
+        assert [company.job_id for company in found] == ["1"]
+    finally:
+        index.close()
+
+
+def test_search_rejects_a_malformed_query(tmp_path):
+    index = JobIndex(str(tmp_path / "jobs.sqlite"))
+    try:
+        with pytest.raises(ValueError, match="not a valid search query"):
+            index.search('job_name:director AND "unclosed')
+    finally:
+        index.close()
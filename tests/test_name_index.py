@@ -0,0 +1,37 @@
+from dataclasses import fields
+
+from scrape.configs import JobScrapeConfig
+from scrape.name_index import FirstNameIndex, NameSplit
+from scrape.networkingasst import (
+    KNOWN_SURNAME_CONFIDENCE,
+    SURNAME_ONLY_CONFIDENCE,
+    NetworkingAssistant,
+)
+
+
+def _index() -> FirstNameIndex:
+    return FirstNameIndex(["Jane", "Jan"], ["Smith", "Doe"])
+
+
+def test_split_prefers_a_first_name_followed_by_a_known_surname():
+    assert _index().split("janedoe") == NameSplit("jane", "doe")
+
+
+def test_split_marks_a_surname_only_split():
+    assert _index().split("xqsmith") == NameSplit("xq", "smith", first_known=False)
+
+
+def _confidence(username: str) -> float:
+    assistant = NetworkingAssistant.__new__(NetworkingAssistant)
+    assistant.first_name_index = _index()
+    assistant.compare_username_against_firstnames_set(username)
+    return assistant.confidence
+
+
+def test_surname_only_split_is_not_trusted_like_a_full_name():
+    assert _confidence("janesmith") == KNOWN_SURNAME_CONFIDENCE
+    assert _confidence("xqsmith") == SURNAME_ONLY_CONFIDENCE
+    default_min_confidence = next(
+        field.default for field in fields(JobScrapeConfig) if field.name == "contact_min_confidence"
+    )
+    assert SURNAME_ONLY_CONFIDENCE < default_min_confidence
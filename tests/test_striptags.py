@@ -0,0 +1,12 @@
+import pytest
+
+from scrape.striptags import iter_words
+
+PAGE = "<p>Meet Shaun O'Neil and Mary-Kate O’Brien, our team leads.</p>"
+WORDS = ["Meet", "Shaun", "O'Neil", "and", "Mary-Kate", "O’Brien", "our", "team", "leads"]
+
+
+@pytest.mark.parametrize("size", range(1, len(PAGE) + 1))
+def test_words_do_not_depend_on_where_the_chunks_break(size):
+    chunks = [PAGE[start : start + size] for start in range(0, len(PAGE), size)]
+    assert list(iter_words(chunks)) == WORDS